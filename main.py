@@ -71,7 +71,7 @@ def run_twitter_bot():
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
-            loop.run_until_complete(bot.run())
+            loop.run_until_complete(bot.run_async())
         except Exception as e:
             print(f"Twitter bot error: {e}")
         finally:
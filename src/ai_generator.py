@@ -1,6 +1,8 @@
 # src/ai_generator.py
 
 from openai import OpenAI
+import requests
+from requests.adapters import HTTPAdapter
 import random
 import json
 from src.config import Config
@@ -20,6 +22,21 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('ai_generator')
 
+# OpenAI client for the web search model, shared by every generator in the process
+_search_client = None
+
+
+def _get_search_client() -> OpenAI:
+    """Return the search-model client, creating it on first use"""
+    global _search_client
+    if _search_client is None:
+        _search_client = OpenAI(
+            api_key=Config.OPENAI_API_KEY,
+            base_url="https://api.openai.com/v1"  # Use standard OpenAI API endpoint
+        )
+    return _search_client
+
+
 class AIGenerator:
     def __init__(self, mode='twitter'):
         self.mode = mode
@@ -59,6 +76,12 @@ class AIGenerator:
         # Use Gemini models
         self.model = Config.GEMINI_MODEL
         
+        # Keep-alive session for direct HTTP APIs (image generation)
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self._http.mount("http://", adapter)
+        self._http.mount("https://", adapter)
+        
         # Initialize memory decision
         self.memory_decision = MemoryDecision()
         
@@ -586,6 +609,16 @@ class AIGenerator:
             # Prepare messages for transformation
             messages = self._prepare_transform_messages(**kwargs)
             
+        except Exception as e:
+            logger.error(f"Error transforming message: {str(e)}")
+            logger.error(f"Stack trace: {traceback.format_exc()}")
+            raise
+        
+        return self.transform_message_from_prepared(messages)
+
+    def transform_message_from_prepared(self, messages):
+        """Transform a message using messages already built by _prepare_transform_messages"""
+        try:
             # Log the messages being sent to the LLM
             logger.info("Transformation messages being sent to LLM:")
             for msg in messages:
@@ -696,8 +729,6 @@ class AIGenerator:
             
             # Check if we have necessary config for external image API
             if api_base_url and api_key:
-                import requests
-                
                 # Prepare request to external image generation API
                 headers = {
                     "Content-Type": "application/json",
@@ -711,7 +742,7 @@ class AIGenerator:
                 }
                 
                 # Make the request to the image API
-                response = requests.post(f"{api_base_url}/images/generations", headers=headers, json=data)
+                response = self._http.post(f"{api_base_url}/images/generations", headers=headers, json=data)
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -772,11 +803,7 @@ class AIGenerator:
         logger.info(f"Making web search request with query: {query}")
         
         try:
-            # Initialize OpenAI client for search model
-            search_client = OpenAI(
-                api_key=Config.OPENAI_API_KEY,
-                base_url="https://api.openai.com/v1"  # Use standard OpenAI API endpoint
-            )
+            search_client = _get_search_client()
             
             # Make request to GPT-4o mini search preview with correct parameter format
             completion = search_client.chat.completions.create(
@@ -8,7 +8,7 @@ from src.config import Config
 from selenium.webdriver.common.by import By
 import time
 import re
-from src.twitter_bot.twitter_service import twitter_service
+from src.twitter_bot.twitter_service import get_twitter_service
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -330,6 +330,7 @@ class AnnouncementBroadcaster:
     @classmethod
     def broadcast_to_twitter(cls, message):
         """Send an announcement to Twitter"""
+        twitter_service = get_twitter_service()
         if twitter_service.is_initialized():
             twitter_service.send_tweet(message, priority=1, source="broadcaster")
             cls.log_debug(f"Announcement sent to Twitter: {message[:30]}...")
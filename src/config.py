@@ -23,6 +23,17 @@ class Config:
     TWITTER_PASSWORD = os.getenv('TWITTER_PASSWORD')
     TWITTER_EMAIL = os.getenv('TWITTER_EMAIL')
 
+    # Persistent Chrome profile so the browser restores the Twitter session natively.
+    # Set CHROME_PROFILE_DIR to an empty value to start from a fresh profile each run.
+    CHROME_PROFILE_DIR = os.getenv('CHROME_PROFILE_DIR', str(Path.home() / '.solexa' / 'chrome-profile'))
+
+    # Skip images, fonts and media in the automation browser (set to false to render fully)
+    BLOCK_MEDIA = os.getenv('BLOCK_MEDIA', 'true').lower() == 'true'
+
+    # Warm browsers kept for reuse between scraper sessions; slot N > 0 uses the sibling CHROME_PROFILE_DIR-N,
+    # since Chrome won't run two instances on one profile directory
+    BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '1'))
+
     # Safely get OPENAI_API_KEY with fallback
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     
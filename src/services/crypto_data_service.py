@@ -1,5 +1,6 @@
 import os
 import logging
+import asyncio
 import aiohttp
 import json
 import time
@@ -11,6 +12,14 @@ from pathlib import Path
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('CryptoDataService')
 
+# (power of ten, suffix) indexed by 4 - floor(log10(value)) // 3, clamped to the table bounds
+_SCALE = [(12, 'T'), (9, 'B'), (6, 'M'), (0, '')]
+
+# Symbol sets come from user messages, so background refreshing is bounded: a refresher stops
+# once its symbols go unread for this many cache periods, and at most MAX_REFRESHERS run at once
+REFRESHER_IDLE_PERIODS = 2
+MAX_REFRESHERS = 20
+
 class CryptoDataService:
     """Service for retrieving cryptocurrency market data from CoinMarketCap"""
     
@@ -24,6 +33,9 @@ class CryptoDataService:
         self.cache = {}
         self.cache_expiry = {}
         self.cache_duration = 300  # Cache data for 5 minutes (300 seconds)
+        self.refresh_margin = 30  # Refresh cached symbols this many seconds before expiry
+        self._refreshers: Dict[str, asyncio.Task] = {}
+        self._last_access: Dict[str, float] = {}  # Last get_crypto_data call per symbol set
     
     async def get_crypto_data(self, symbols: str = "BTC,SOL") -> Dict[str, Any]:
         """
@@ -37,12 +49,31 @@ class CryptoDataService:
         """
         cache_key = symbols
         current_time = time.time()
+        self._last_access[cache_key] = current_time
         
         # Check if we have cached data that hasn't expired
         if cache_key in self.cache and self.cache_expiry.get(cache_key, 0) > current_time:
             logger.info(f"Using cached data for {symbols}")
             return self.cache[cache_key]
         
+        result = await self._fetch(symbols)
+        if result:
+            self._ensure_refresher(symbols)
+        return result
+    
+    async def _fetch(self, symbols: str) -> Dict[str, Any]:
+        """
+        Fetch data from the API and store it in the cache, bypassing the cache-hit check
+        
+        Args:
+            symbols: Comma-separated list of cryptocurrency symbols
+            
+        Returns:
+            Dictionary with cryptocurrency data or empty dict on failure
+        """
+        cache_key = symbols
+        current_time = time.time()
+        
         if not self.api_key:
             logger.error("Cannot fetch crypto data: No API key provided")
             return {}
@@ -83,12 +114,15 @@ class CryptoDataService:
                         if symbol in data['data']:
                             crypto_data = data['data'][symbol]
                             quote = crypto_data['quote']['USD']
+                            market_cap = Decimal(str(quote['market_cap']))
                             result[symbol] = {
                                 'id': crypto_data['id'],
                                 'name': crypto_data['name'],
                                 'symbol': crypto_data['symbol'],
                                 'price': Decimal(str(quote['price'])),
-                                'market_cap': Decimal(str(quote['market_cap'])),
+                                'market_cap': market_cap,
+                                # Formatted once per fetch so cache hits don't reformat
+                                'formatted_market_cap': self.format_market_cap(market_cap),
                                 'percent_change_24h': Decimal(str(quote['percent_change_24h'])),
                                 'volume_24h': Decimal(str(quote['volume_24h'])),
                                 'last_updated': quote['last_updated']
@@ -110,16 +144,67 @@ class CryptoDataService:
         
         return {}
     
+    def _ensure_refresher(self, symbols: str):
+        """Start a background refresh task for a symbol set if one isn't running"""
+        task = self._refreshers.get(symbols)
+        if task is not None and not task.done():
+            return
+        # Drop finished refreshers and stale access times, then make room by stopping the least recently read one
+        for key in [key for key, task in self._refreshers.items() if task.done()]:
+            del self._refreshers[key]
+        stale_before = time.time() - REFRESHER_IDLE_PERIODS * self.cache_duration
+        for key in [key for key, at in self._last_access.items() if at < stale_before and key not in self._refreshers]:
+            del self._last_access[key]
+        if len(self._refreshers) >= MAX_REFRESHERS:
+            oldest = min(self._refreshers, key=lambda key: self._last_access.get(key, 0))
+            self._refreshers.pop(oldest).cancel()
+        interval = max(self.cache_duration - self.refresh_margin, 1)
+        self._refreshers[symbols] = asyncio.create_task(self._refresh_loop(symbols, interval))
+    
+    async def _refresh_loop(self, symbols: str, interval: float):
+        """
+        Periodically refresh cached data shortly before it expires so callers
+        always hit the cache
+        
+        Args:
+            symbols: Comma-separated list of cryptocurrency symbols
+            interval: Seconds to wait between refreshes
+        """
+        idle_ttl = REFRESHER_IDLE_PERIODS * self.cache_duration
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                if time.time() - self._last_access.get(symbols, 0) > idle_ttl:
+                    logger.info(f"No reads of {symbols} for {idle_ttl}s, stopping background refresh")
+                    if self._refreshers.get(symbols) is asyncio.current_task():
+                        del self._refreshers[symbols]
+                    self._last_access.pop(symbols, None)
+                    return
+                result = await self._fetch(symbols)
+                if not result:
+                    logger.warning(f"Background refresh failed for {symbols}, will retry next cycle")
+        except asyncio.CancelledError:
+            logger.info(f"Stopped background refresh for {symbols}")
+            raise
+    
+    async def aclose(self):
+        """Cancel all background refresh tasks"""
+        tasks = list(self._refreshers.values())
+        self._refreshers.clear()
+        self._last_access.clear()
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
     def format_market_cap(self, market_cap: Decimal) -> str:
         """Format market cap value for human-readable output"""
-        if market_cap >= 1_000_000_000_000:  # Trillion
-            return f"${market_cap / 1_000_000_000_000:.2f}T"
-        elif market_cap >= 1_000_000_000:  # Billion
-            return f"${market_cap / 1_000_000_000:.2f}B"
-        elif market_cap >= 1_000_000:  # Million
-            return f"${market_cap / 1_000_000:.2f}M"
-        else:
+        if market_cap <= 0:
             return f"${market_cap:.2f}"
+        # Stay in Decimal so rounding matches the quoted digits: adjusted() is the exact
+        # floor(log10) and scaleb() shifts the exponent without a lossy division
+        exponent, suffix = _SCALE[max(0, min(3, 4 - market_cap.adjusted() // 3))]
+        return f"${market_cap.scaleb(-exponent):.2f}{suffix}"
     
     async def get_formatted_marketcap_data(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
@@ -138,12 +223,11 @@ class CryptoDataService:
                 return None
             
             crypto_data = data[symbol]
-            formatted_market_cap = self.format_market_cap(crypto_data['market_cap'])
             
             return {
                 "ticker": f"${symbol}",
                 "value": crypto_data['market_cap'],
-                "formatted_value": formatted_market_cap,
+                "formatted_value": crypto_data['formatted_market_cap'],
                 "name": crypto_data['name'],
                 "price": crypto_data['price'],
                 "percent_change_24h": crypto_data['percent_change_24h']
@@ -67,6 +67,10 @@ class TelegramBot:
         logger.error("Update %s caused error %s", update, context.error, exc_info=context.error)
         return False
 
+    async def post_shutdown(self, application: Application):
+        """Stop background market data refreshes once the application has shut down."""
+        await self.crypto_service.aclose()
+
     def setup(self) -> Application:
         """
         Build the Application with job queue,
@@ -84,6 +88,7 @@ class TelegramBot:
                 .pool_timeout(20.0)       # Increase pool timeout
                 .read_timeout(30.0)       # Increase read timeout
                 .write_timeout(30.0)      # Increase write timeout
+                .post_shutdown(self.post_shutdown)
                 .build()
             )
 
@@ -1,7 +1,11 @@
 #!/usr/bin/env python
 # src/testing/transform_diagnostic.py
 
+import argparse
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 import json
 import os
@@ -11,14 +15,22 @@ import time
 import random
 import traceback
 
-# Configure root logger
+# Configure root logger; records are queued and written by a background listener
+# so file and console output stay off the transform path
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_stream_handler = logging.StreamHandler(sys.stdout)
+_stream_handler.setFormatter(_log_formatter)
+_file_handler = logging.FileHandler('transform_diagnostic.log')
+_file_handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, _stream_handler, _file_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('transform_diagnostic.log')
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 
 # Create a dedicated logger for this diagnostic
@@ -47,10 +59,36 @@ class TransformDiagnostic:
         self.twitter_generator = AIGenerator(mode='twitter')
         self.telegram_generator = AIGenerator(mode='discord_telegram')
         
+        # Pre-shuffled memory copies and read cursors, keyed by generator
+        self._shuffled_memories = {}
+        for generator in (self.twitter_generator, self.telegram_generator):
+            if isinstance(generator.memories, list):
+                self._shuffle_memories(generator)
+        
         # Track timing information
         self.start_time = 0
         self.end_time = 0
     
+    def _shuffle_memories(self, generator):
+        """Shuffle a copy of the generator's memories once and reset its cursor."""
+        shuffled = generator.memories[:]
+        random.shuffle(shuffled)
+        self._shuffled_memories[id(generator)] = [shuffled, 0, len(generator.memories)]
+        return self._shuffled_memories[id(generator)]
+    
+    def _sample_memories(self, generator, count=3):
+        """Take the next memories from the pre-shuffled list, wrapping around at the end."""
+        entry = self._shuffled_memories.get(id(generator))
+        if entry is None or entry[2] != len(generator.memories):
+            entry = self._shuffle_memories(generator)
+        shuffled, cursor, total = entry
+        count = min(count, total)
+        sample = shuffled[cursor:cursor + count]
+        if len(sample) < count:
+            sample += shuffled[:count - len(sample)]
+        entry[1] = (cursor + count) % total if total else 0
+        return sample
+    
     def _load_transform_prompt(self):
         """Load the transformation system prompt for reference using the improved path handling."""
         try:
@@ -122,7 +160,7 @@ class TransformDiagnostic:
                 memory_status = f"Using {memories_count} existing memories from generator"
                 # Sample random memories like ai_generator.py does
                 if isinstance(generator.memories, list):
-                    memories_to_use = random.sample(generator.memories, min(3, len(generator.memories)))
+                    memories_to_use = self._sample_memories(generator)
                 else:
                     memories_to_use = generator.memories
             else:
@@ -131,12 +169,16 @@ class TransformDiagnostic:
             
             logger.info(f"Memory status: {memory_status}")
             
+            # Stringify once and reuse it for the length check and the slice
+            memory_str = str(memories_to_use) if memories_to_use else "None"
+            memory_preview = memory_str[:200] + "..." if len(memory_str) > 200 else memory_str
+            
             # Add memory info to diagnostic results
             diagnostic_results["process_steps"].append({
                 "step": "memory_preparation",
                 "description": "Memory context preparation",
                 "memory_status": memory_status,
-                "memory_sample": str(memories_to_use)[:200] + "..." if memories_to_use and len(str(memories_to_use)) > 200 else str(memories_to_use)
+                "memory_sample": memory_preview
             })
             
             # Step 2: Get the system prompt that will be used
@@ -148,13 +190,15 @@ class TransformDiagnostic:
                 
             transform_messages = generator._prepare_transform_messages(**kwargs)
             system_prompt = transform_messages[0]["content"] if transform_messages else "No system prompt available"
+            system_prompt_length = len(system_prompt)
+            system_prompt_preview = system_prompt[:200] + "..." if system_prompt_length > 200 else system_prompt
             
             # Add the prepared system prompt to results
             diagnostic_results["process_steps"].append({
                 "step": "system_prompt_preparation",
                 "description": "System prompt prepared for transformation",
-                "system_prompt_preview": system_prompt[:200] + "..." if len(system_prompt) > 200 else system_prompt,
-                "system_prompt_length": len(system_prompt)
+                "system_prompt_preview": system_prompt_preview,
+                "system_prompt_length": system_prompt_length
             })
             
             # Step 3: Get the user prompt that will be sent to the model
@@ -171,8 +215,8 @@ class TransformDiagnostic:
             logger.info("Starting transformation process")
             self.start_time = time.time()
             
-            # Call the actual transformation method with the same kwargs
-            transformed_content = generator.transform_message(**kwargs)
+            # Reuse the prepared messages instead of building them a second time
+            transformed_content = generator.transform_message_from_prepared(transform_messages)
             
             self.end_time = time.time()
             processing_time = self.end_time - self.start_time
@@ -355,40 +399,69 @@ def run_sample_tests():
     print("Check the log file and JSON output files for detailed results.")
 
 
+def _prompt_for_diagnostic_args():
+    """Collect diagnostic parameters interactively from the terminal."""
+    use_sample = input("Run sample tests? (y/n, default: y): ").strip().lower()
+    if use_sample != 'n':
+        return True, None, None, None
+    
+    message = input("\nEnter message to transform: ")
+    platform = input("Select platform (twitter/telegram, default: twitter): ").strip().lower()
+    
+    # Ask if user wants to provide custom memories
+    use_custom_memories = input("Use custom memories? (y/n, default: n): ").strip().lower() == 'y'
+    custom_memories = None
+    
+    if use_custom_memories:
+        print("Enter up to 3 memories (one per line, blank line to finish):")
+        custom_memories = []
+        for i in range(3):
+            memory = input(f"Memory {i+1}: ").strip()
+            if not memory:
+                break
+            custom_memories.append(memory)
+        
+        if not custom_memories:
+            custom_memories = None
+            print("No custom memories provided, using system memories.")
+    
+    return False, message, platform, custom_memories
+
+
+def _parse_args(argv=None):
+    """Parse command line arguments for non-interactive runs."""
+    parser = argparse.ArgumentParser(description="AI Transformation Diagnostic Tool")
+    parser.add_argument("--message", help="Message to transform")
+    parser.add_argument("--platform", default="twitter", help="Platform to use (twitter/telegram)")
+    parser.add_argument("--memory", action="append", dest="memories",
+                        help="Custom memory to use (can be repeated)")
+    parser.add_argument("--sample", action="store_true", help="Run the sample test suite")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
     print("AI Transformation Diagnostic Tool")
     print("=================================")
     
-    # Check if user wants to run sample tests or provide custom input
-    use_sample = input("Run sample tests? (y/n, default: y): ").strip().lower()
+    args = _parse_args()
     
-    if use_sample != 'n':
+    if args.sample:
+        use_sample, message, platform, custom_memories = True, None, None, None
+    elif args.message is not None:
+        use_sample, message, platform, custom_memories = False, args.message, args.platform, args.memories
+    elif sys.stdin.isatty():
+        # Only prompt when nothing was passed and a human is at the terminal
+        use_sample, message, platform, custom_memories = _prompt_for_diagnostic_args()
+    else:
+        use_sample, message, platform, custom_memories = True, None, None, None
+    
+    if use_sample:
         run_sample_tests()
     else:
-        # Get user input for custom test
         diagnostic = TransformDiagnostic()
         
-        message = input("\nEnter message to transform: ")
-        platform = input("Select platform (twitter/telegram, default: twitter): ").strip().lower()
         if platform not in ['twitter', 'telegram']:
             platform = 'twitter'
-            
-        # Ask if user wants to provide custom memories
-        use_custom_memories = input("Use custom memories? (y/n, default: n): ").strip().lower() == 'y'
-        custom_memories = None
-        
-        if use_custom_memories:
-            print("Enter up to 3 memories (one per line, blank line to finish):")
-            custom_memories = []
-            for i in range(3):
-                memory = input(f"Memory {i+1}: ").strip()
-                if not memory:
-                    break
-                custom_memories.append(memory)
-            
-            if not custom_memories:
-                custom_memories = None
-                print("No custom memories provided, using system memories.")
         
         # Run diagnostic with user input
         results = diagnostic.run_diagnostic(
@@ -412,4 +485,4 @@ if __name__ == "__main__":
             for key, value in results['style_analysis'].items():
                 if key != 'marker_count':
                     print(f"- {key.replace('_', ' ').title()}: {'Yes' if value else 'No'}")
-            print(f"- Total Style Markers: {results['style_analysis'].get('marker_count', 0)}") 
\ No newline at end of file
+            print(f"- Total Style Markers: {results['style_analysis'].get('marker_count', 0)}")
@@ -3,38 +3,101 @@
 import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
 import logging
 import json
 import os
+import tempfile
+import threading
+from urllib.parse import urlparse
 from src.config import Config
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logger = logging.getLogger('Authenticator')
 
+# Locators shared by the login flow and the Scraper
+POST_BOX = (By.XPATH, "//div[@aria-label='Post text']")
+OCF_INPUT = (By.CSS_SELECTOR, "input[data-testid='ocfEnterTextTextInput']")
+USERNAME_INPUT = (By.NAME, "text")
+PASSWORD_INPUT = (By.NAME, "password")
+# Continue button locators in priority order: the data-testid button, then either label in one lookup
+CONTINUE_BUTTONS = (
+    (By.CSS_SELECTOR, "button[data-testid='ocfEnterTextNextButton']"),
+    (By.XPATH, "//button[@role='button'][.//span[contains(text(), 'Weiter') or contains(text(), 'Next')]]"),
+)
+LOGOUT_CONFIRM = (By.XPATH, "//div[@data-testid='confirmationSheetConfirm']")
+
+# Hosts whose pages can POST the logout endpoint same-origin and read the session cookies
+TWITTER_HOSTS = ("twitter.com", "x.com")
+
+# POSTs the logout endpoint from the current page with the CSRF token; resolves to the HTTP status
+LOGOUT_FETCH_JS = (
+    "return fetch('/i/flow/logout', {method: 'POST', credentials: 'include', "
+    "headers: {'x-csrf-token': arguments[0]}}).then(function(r) { return r.status; });"
+)
+
+# Banners shown when Twitter asks for the account email before continuing
+EMAIL_VERIFICATION_TEXTS = (
+    "Gib deine Telefonnummer oder E-Mail-Adresse ein",
+    "Enter your phone number or email address",
+    "Hilf uns, deinen Account sicher zu halten",
+    "Verifiziere deine Identität"
+)
+
+# Returns the first banner text found on the page, or null
+EMAIL_VERIFICATION_JS = (
+    "var t = document.body ? document.body.innerText : '';"
+    "var keys = " + json.dumps(EMAIL_VERIFICATION_TEXTS) + ";"
+    "for (var i = 0; i < keys.length; i++) { if (t.indexOf(keys[i]) > -1) return keys[i]; }"
+    "return null;"
+)
+
 class Authenticator:
-    def __init__(self, driver):
+    SESSION_FILE = os.path.join(os.path.dirname(__file__), "twitter_session.json")
+
+    def __init__(self, driver, prefetched_cookies=None):
         self.driver = driver
+        # Cookies read ahead of time (e.g. while Chrome was starting); used once by load_session
+        self._prefetched_cookies = prefetched_cookies
+        # Shared explicit wait so each step proceeds as soon as the DOM is ready
+        self._wait = WebDriverWait(driver, 10, poll_frequency=0.25)
         self.username = Config.TWITTER_USERNAME
         self.password = Config.TWITTER_PASSWORD
         self.email = Config.TWITTER_EMAIL
-        self.session_file = os.path.join(os.path.dirname(__file__), "twitter_session.json")
+        self.session_file = self.SESSION_FILE
 
     def save_cookies(self, cookies, file_path):
-        """Save cookies to a file"""
+        """Save cookies to a file atomically so readers never see a partial write"""
         try:
-            with open(file_path, 'w') as f:
-                json.dump(cookies, f)
+            directory = os.path.dirname(file_path) or "."
+            data = orjson.dumps(cookies) if orjson else json.dumps(cookies).encode()
+            with tempfile.NamedTemporaryFile('wb', dir=directory, suffix='.tmp', delete=False) as f:
+                f.write(data)
+                tmp_path = f.name
+            os.replace(tmp_path, file_path)
             logger.info("Cookies saved successfully")
         except Exception as e:
             logger.error(f"Error saving cookies: {e}")
 
     def load_cookies(self, file_path):
         """Load cookies from a file"""
+        return self.load_cookies_static(file_path)
+
+    @staticmethod
+    def load_cookies_static(file_path):
+        """Load cookies from a file without needing a driver"""
         try:
             if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    return json.load(f)
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+                return orjson.loads(data) if orjson else json.loads(data)
         except Exception as e:
             logger.error(f"Error loading cookies: {e}")
         return None
@@ -42,12 +105,38 @@ class Authenticator:
     def save_session(self):
         """Save the current session cookies"""
         cookies = self.driver.get_cookies()
-        self.save_cookies(cookies, self.session_file)
-        logger.info("Session saved successfully!")
+        # Writing is non-fatal and idempotent, so keep the disk I/O off the login path
+        threading.Thread(
+            target=self.save_cookies, args=(cookies, self.session_file), daemon=True
+        ).start()
+        logger.info("Session save started")
+
+    def _profile_session_active(self) -> bool:
+        """Check whether the persistent browser profile is already logged in"""
+        try:
+            self.driver.get("https://twitter.com/home")
+            WebDriverWait(self.driver, 5, poll_frequency=0.25).until(
+                EC.presence_of_element_located(POST_BOX)
+            )
+            return True
+        except WebDriverException as e:
+            # TimeoutException means not logged in; anything else (crashed renderer, lost session)
+            # also falls back to the cookie or credential login instead of aborting it
+            if not isinstance(e, TimeoutException):
+                logger.warning(f"Could not check the browser profile session: {e}")
+            return False
 
     def load_session(self) -> bool:
         """Load and verify a saved session"""
-        cookies = self.load_cookies(self.session_file)
+        # The browser profile restores cookies natively; only fall back to the
+        # saved cookie file when it isn't already logged in
+        if Config.CHROME_PROFILE_DIR and self._profile_session_active():
+            logger.info("Session restored from browser profile!")
+            return True
+
+        cookies, self._prefetched_cookies = self._prefetched_cookies, None
+        if cookies is None:
+            cookies = self.load_cookies(self.session_file)
         if not cookies:
             logger.info("No saved session found.")
             return False
@@ -67,14 +156,13 @@ class Authenticator:
 
             # Refresh and verify login status
             self.driver.get("https://twitter.com/home")
-            time.sleep(3)
             
-            # Verify we're logged in by looking for the post box
-            self.driver.find_element(By.XPATH, "//div[@aria-label='Post text']")
+            # Verify we're logged in by waiting for the post box
+            self._wait.until(EC.presence_of_element_located(POST_BOX))
             logger.info("Session restored successfully!")
             return True
 
-        except NoSuchElementException:
+        except (NoSuchElementException, TimeoutException):
             logger.warning("Saved session is invalid or expired.")
             # Delete the invalid session file
             if os.path.exists(self.session_file):
@@ -93,22 +181,34 @@ class Authenticator:
 
             logger.info("Attempting to log in to Twitter.")
             self.driver.get("https://twitter.com/login")
-            time.sleep(3)  # Wait for page to load
 
-            # Enter username
-            username_field = self.driver.find_element(By.NAME, "text")
+            # Enter username once the field is present
+            username_field = self._wait.until(EC.presence_of_element_located(USERNAME_INPUT))
             username_field.send_keys(self.username)
             username_field.send_keys(Keys.RETURN)
-            time.sleep(2)
+            
+            # Wait for the username step to be replaced by the next screen
+            try:
+                self._wait.until(EC.staleness_of(username_field))
+            except TimeoutException:
+                logger.debug("Username field still attached, continuing with next step")
 
             # Check if we're asked for email verification before password
             self._handle_email_verification()
             
             # Enter password
-            password_field = self.driver.find_element(By.NAME, "password")
+            password_field = self._wait.until(EC.presence_of_element_located(PASSWORD_INPUT))
             password_field.send_keys(self.password)
             password_field.send_keys(Keys.RETURN)
-            time.sleep(5)  # Wait for login to complete
+            
+            # Wait for login to complete or for an email verification prompt
+            try:
+                self._wait.until(EC.any_of(
+                    EC.presence_of_element_located(POST_BOX),
+                    EC.presence_of_element_located(OCF_INPUT)
+                ))
+            except TimeoutException:
+                logger.debug("Neither post box nor verification input appeared after password")
             
             # Check again for email verification after password
             self._handle_email_verification()
@@ -118,12 +218,12 @@ class Authenticator:
             
             # Verify login success
             try:
-                self.driver.find_element(By.XPATH, "//div[@aria-label='Post text']")
+                self._wait.until(EC.presence_of_element_located(POST_BOX))
                 logger.info("Login successful!")
                 # Save session after successful login
                 self.save_session()
                 return True
-            except NoSuchElementException:
+            except TimeoutException:
                 logger.error("Login failed - could not find post box")
                 return False
 
@@ -131,85 +231,98 @@ class Authenticator:
             logger.error(f"Login failed: {e}")
             return False
 
+    def _wait_for_next_step(self):
+        """Wait until the password field or a verification input is on the page"""
+        try:
+            self._wait.until(EC.any_of(
+                EC.presence_of_element_located(PASSWORD_INPUT),
+                EC.presence_of_element_located(OCF_INPUT)
+            ))
+        except TimeoutException:
+            logger.debug("Next login step did not appear within the wait timeout")
+
     def _handle_email_verification(self):
         """Handle the email verification screen during login"""
         try:
-            # Check for different types of email verification screens
-            email_verification_texts = [
-                "Gib deine Telefonnummer oder E-Mail-Adresse ein",
-                "Enter your phone number or email address",
-                "Hilf uns, deinen Account sicher zu halten",
-                "Verifiziere deine Identität"
-            ]
-            
+            # Check the data-testid input first; it hits the browser's selector engine directly
             screen_detected = False
-            for text in email_verification_texts:
-                email_verification_elements = self.driver.find_elements(By.XPATH, 
-                    f"//*[contains(text(), '{text}')]")
-                if email_verification_elements:
-                    screen_detected = True
-                    logger.info(f"Email verification screen detected: '{text}'")
-                    break
+            if self.driver.find_elements(*OCF_INPUT):
+                screen_detected = True
+                logger.info("Email verification screen detected via input field")
             
-            # Also check directly for the input field as a fallback
+            # Fall back to the localized banner texts for older UI versions
             if not screen_detected:
-                email_input = self.driver.find_elements(By.XPATH, "//input[@data-testid='ocfEnterTextTextInput']")
-                if email_input:
+                matched_text = self.driver.execute_script(EMAIL_VERIFICATION_JS)
+                if matched_text:
                     screen_detected = True
-                    logger.info("Email verification screen detected via input field")
+                    logger.info(f"Email verification screen detected: '{matched_text}'")
             
             if screen_detected:
                 # Look for the input field
                 try:
-                    input_field = self.driver.find_element(By.NAME, "text")
+                    input_field = self.driver.find_element(*USERNAME_INPUT)
                 except NoSuchElementException:
                     # Try alternative selector if the name attribute doesn't work
-                    input_field = self.driver.find_element(By.XPATH, "//input[@data-testid='ocfEnterTextTextInput']")
+                    input_field = self.driver.find_element(*OCF_INPUT)
                 
                 if input_field:
                     input_field.clear()
                     input_field.send_keys(self.email)
                     logger.info(f"Entered email: {self.email}")
                     
-                    # Look for the continue/submit button using data-testid
-                    try:
-                        continue_button = self.driver.find_element(By.XPATH, "//button[@data-testid='ocfEnterTextNextButton']")
+                    # Look for the continue button by data-testid first, then by its label
+                    continue_button = next(
+                        (button for locator in CONTINUE_BUTTONS for button in self.driver.find_elements(*locator)),
+                        None
+                    )
+                    if continue_button:
                         continue_button.click()
                         logger.info("Clicked continue button after entering email")
-                        time.sleep(3)  # Wait for the next screen to load
-                    except NoSuchElementException:
-                        # Try with role and text
-                        try:
-                            continue_button = self.driver.find_element(By.XPATH, "//button[@role='button']//span[contains(text(), 'Weiter')]/..")
-                            continue_button.click()
-                            logger.info("Clicked continue button after entering email (using text)")
-                            time.sleep(3)
-                        except NoSuchElementException:
-                            # Try English button text
-                            try:
-                                continue_button = self.driver.find_element(By.XPATH, "//button[@role='button']//span[contains(text(), 'Next')]/..")
-                                continue_button.click()
-                                logger.info("Clicked continue button after entering email (using English text)")
-                                time.sleep(3)
-                            except NoSuchElementException:
-                                # Try to press Enter key if button not found
-                                input_field.send_keys(Keys.RETURN)
-                                logger.info("Pressed Enter key after entering email")
-                                time.sleep(3)
+                    else:
+                        # Press Enter if no button was found
+                        input_field.send_keys(Keys.RETURN)
+                        logger.info("Pressed Enter key after entering email")
+                    self._wait_for_next_step()
         
         except Exception as e:
             logger.warning(f"Error during email verification handling: {e}")
             # Don't raise the exception, just log it and continue the login flow
             pass
 
+    def _logout_via_fetch(self) -> bool:
+        """Log out with a direct POST from the page, skipping the confirmation UI"""
+        # The fetch URL is relative, so it must run from a Twitter page
+        host = urlparse(self.driver.current_url).hostname or ""
+        if not any(host == h or host.endswith("." + h) for h in TWITTER_HOSTS):
+            self.driver.get("https://twitter.com")
+        ct0 = self.driver.get_cookie("ct0")
+        if not ct0:
+            return False
+        status = self.driver.execute_script(LOGOUT_FETCH_JS, ct0["value"])
+        return isinstance(status, int) and 200 <= status < 300 and self._session_cleared()
+
+    def _session_cleared(self) -> bool:
+        """True once the auth cookie is gone from the browser"""
+        return self.driver.get_cookie("auth_token") is None
+
     def logout(self):
         """Log out from Twitter"""
         try:
-            self.driver.get("https://twitter.com/logout")
-            time.sleep(2)
-            confirm_button = self.driver.find_element(By.XPATH, "//div[@data-testid='confirmationSheetConfirm']")
-            confirm_button.click()
-            time.sleep(3)
+            try:
+                logged_out = self._logout_via_fetch()
+            except Exception as e:
+                logger.warning(f"Direct logout request failed: {e}")
+                logged_out = False
+            
+            if not logged_out:
+                # Fall back to the confirmation page flow
+                self.driver.get("https://twitter.com/logout")
+                confirm_button = self._wait.until(EC.element_to_be_clickable(LOGOUT_CONFIRM))
+                confirm_button.click()
+                time.sleep(3)
+                if not self._session_cleared():
+                    logger.warning("Logout did not clear the auth cookie; keeping the saved session")
+                    return
             # Delete session file
             if os.path.exists(self.session_file):
                 os.remove(self.session_file)
@@ -224,7 +337,7 @@ class Authenticator:
             time.sleep(3)  # Wait for page to load completely after verification
             
             try:
-                self.driver.find_element(By.XPATH, "//div[@aria-label='Post text']")
+                self.driver.find_element(*POST_BOX)
                 logger.info("Login successful after verification!")
                 # Save session after successful login
                 self.save_session()
@@ -235,7 +348,7 @@ class Authenticator:
                 time.sleep(3)
                 
                 try:
-                    self.driver.find_element(By.XPATH, "//div[@aria-label='Post text']")
+                    self.driver.find_element(*POST_BOX)
                     logger.info("Login successful after navigating to home!")
                     self.save_session()
                     return True
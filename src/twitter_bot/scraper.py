@@ -1,38 +1,396 @@
 # src/twitter_bot/scraper.py
 
+import requests
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options
 from typing import Optional
-from .authenticator import Authenticator
+from .authenticator import Authenticator, OCF_INPUT
 from .tweets import TweetManager
+from src.config import Config
+from src.verification_manager import VerificationManager
+import atexit
+import base64
 import logging
+import queue
+import signal
+import threading
 import time
 import os
+import json
+import socket
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import (
+    InvalidArgumentException, StaleElementReferenceException, TimeoutException,
+    WebDriverException
+)
 
 # Configure logging
 logger = logging.getLogger('Scraper')
 
+# JPEG quality for verification screenshots captured through CDP
+SCREENSHOT_JPEG_QUALITY = int(os.getenv("SCREENSHOT_JPEG_QUALITY", "60"))
+
+# Verification screenshots; use the shared volume in Docker environments
+if os.environ.get("DOCKER_ENV") == "true":
+    _SCREENSHOT_DIR = Path("/app/static/screenshots")
+else:
+    _SCREENSHOT_DIR = Path(__file__).resolve().parents[2] / "static" / "screenshots"
+try:
+    _SCREENSHOT_DIR.mkdir(parents=True, exist_ok=True)
+except OSError as e:
+    logger.warning(f"Could not create screenshots directory {_SCREENSHOT_DIR}: {e}")
+
+# Explicit wait used after submitting a verification step instead of a fixed sleep
+SHORT_WAIT_TIMEOUT = 5
+SHORT_WAIT_POLL = 0.1
+# Length of the rendered body, compared before and after a submit to detect a transition
+PAGE_LENGTH_JS = "return document.body ? document.body.innerHTML.length : 0;"
+
+# Admin panel base URL; Docker environments always use localhost
+if os.environ.get("DOCKER_ENV") == "true":
+    ADMIN_BASE_URL = "http://localhost:5000"
+else:
+    ADMIN_BASE_URL = os.environ.get("ADMIN_BASE_URL", "http://localhost:5000")
+
+# Admin notification endpoints, tried in order until one accepts
+NOTIFICATION_URLS = tuple(url for url in (
+    "http://localhost:5000/api/admin/notifications",
+    os.environ.get("NOTIFICATION_URL", ""),
+    os.environ.get("INTERNAL_NOTIFICATION_URL", ""),
+    "http://127.0.0.1:5000/api/admin/notifications",
+    "http://web-interface:5000/api/admin/notifications"
+) if url)
+
+# Cheap page fingerprint used to skip rewriting an identical verification screenshot
+SCREENSHOT_FINGERPRINT_JS = "return document.body.innerHTML.length + ':' + location.href;"
+
+# Re-requests images that failed while media was blocked and resolves once they
+# settle (or after the cap), without reloading and losing the verification flow
+RELOAD_IMAGES_EXPR = (
+    "new Promise(function (done) {"
+    "  var pending = Array.prototype.filter.call(document.images, function (img) {"
+    "    return img.src && !(img.complete && img.naturalWidth);"
+    "  });"
+    "  var left = pending.length;"
+    "  if (!left) { done(0); return; }"
+    "  var settle = function () { if (--left <= 0) { done(pending.length); } };"
+    "  pending.forEach(function (img) {"
+    "    img.addEventListener('load', settle, {once: true});"
+    "    img.addEventListener('error', settle, {once: true});"
+    "    img.src = img.src;"
+    "  });"
+    "  setTimeout(function () { done(pending.length); }, %d);"
+    "})"
+)
+SCREENSHOT_IMAGE_WAIT_MS = 3000
+
+# Launch flags that disable Chrome features irrelevant to the bot
+LEAN_CHROME_ARGUMENTS = (
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-translate",
+    "--mute-audio",
+    "--no-first-run"
+)
+
+# Resource patterns skipped when Config.BLOCK_MEDIA is on; the bot only needs DOM text and inputs
+BLOCKED_MEDIA_URLS = (
+    "*.jpg", "*.jpeg", "*.png", "*.webp", "*.gif", "*.svg", "*.mp4",
+    "*.woff", "*.woff2", "abs.twimg.com/responsive-web/*.css"
+)
+
+# Verification code form locators, combined so each lookup is a single round-trip
+CODE_INPUT_CSS = (
+    "input[name='text'], input[placeholder*='code' i], "
+    "input[data-testid='ocfEnterTextTextInput']"
+)
+SUBMIT_BUTTON_CSS = "button[data-testid='ocfEnterTextNextButton'], button[type='submit']"
+
+# Submit/continue button, falling back to a label match
+_CONTINUE_BUTTON_EXPR = (
+    "document.querySelector(" + json.dumps(SUBMIT_BUTTON_CSS) + ") || "
+    "Array.prototype.find.call(document.querySelectorAll('button'), function(b) {"
+    "return /Next|Verify|Submit|Continue|Weiter/.test(b.innerText); }) || null"
+)
+CONTINUE_BUTTON_JS = "return " + _CONTINUE_BUTTON_EXPR + ";"
+
+# Returns [input, button] as WebElements (or nulls)
+VERIFICATION_FORM_JS = (
+    "var input = document.querySelector(" + json.dumps(CODE_INPUT_CSS) + ");"
+    "var button = " + _CONTINUE_BUTTON_EXPR + ";"
+    "return [input, button];"
+)
+
+# WebDriver launch errors that usually clear up on a retry
+TRANSIENT_LAUNCH_ERRORS = ("chrome not reachable", "session not created", "timed out", "connection refused")
+
+# Resolved chromedriver path, keyed by the installed Chrome version
+CHROMEDRIVER_CACHE_FILE = Path.home() / ".solexa" / "chromedriver.cache.json"
+
+# Texts that indicate Twitter is asking for a verification code or email
+VERIFICATION_TEXTS = (
+    "Sieh in deiner E-Mail nach",  # German
+    "Check your email",            # English
+    "Bestätigungscode",            # German
+    "verification code",           # English
+    "Gib deine Telefonnummer oder E-Mail-Adresse ein",  # German email verification
+    "Enter your phone number or email address",         # English email verification
+    "Hilf uns, deinen Account sicher zu halten",        # German account security
+    "Verifiziere deine Identität"                       # German identity verification
+)
+
+# Email verification banners checked before falling back to the code flow
+EMAIL_VERIFICATION_TEXTS = (
+    "Gib deine Telefonnummer oder E-Mail-Adresse ein",
+    "Enter your phone number or email address"
+)
+# One predicate over all texts so detection is a single round-trip and DOM traversal
+EMAIL_VERIFICATION_XPATH = "//*[" + " or ".join(
+    f"contains(text(), {json.dumps(text, ensure_ascii=False)})" for text in EMAIL_VERIFICATION_TEXTS
+) + "]"
+
+# Attribute selectors for verification inputs; checked before the slower text scan
+VERIFICATION_INPUT_CSS = (
+    "input[autocomplete='one-time-code'], input[name='text'][inputmode='numeric'], "
+    "input[data-testid='ocfEnterTextTextInput'], input[placeholder*='code' i]"
+)
+
+# In-page check for all verification markers, so one poll is one round-trip
+_VERIFICATION_CHECK_FN = (
+    "function() {"
+    "if (document.querySelector(" + json.dumps(VERIFICATION_INPUT_CSS) + ") !== null) return true;"
+    "var t = document.body ? document.body.innerText : '';"
+    "var keys = " + json.dumps(VERIFICATION_TEXTS) + ";"
+    "for (var i = 0; i < keys.length; i++) { if (t.indexOf(keys[i]) > -1) return true; }"
+    "return false;"
+    "}"
+)
+VERIFICATION_SCREEN_JS = "return (" + _VERIFICATION_CHECK_FN + ")();"
+# Same check as a bare expression for CDP Runtime.evaluate
+VERIFICATION_SCREEN_EXPR = "(" + _VERIFICATION_CHECK_FN + ")()"
+
+# Installs a MutationObserver that flips window.__solexa_verify_done once the
+# verification screen disappears, so the wait loop only reads a boolean
+VERIFICATION_WATCH_JS = (
+    "var isVerification = " + _VERIFICATION_CHECK_FN + ";"
+    "window.__solexa_verify_done = false;"
+    "var check = function() { window.__solexa_verify_done = !isVerification(); };"
+    "new MutationObserver(check).observe(document.body, {childList: true, subtree: true, characterData: true});"
+    "check();"
+    "return window.__solexa_verify_done;"
+)
+VERIFICATION_DONE_JS = "return window.__solexa_verify_done;"
+
+# Seconds to wait for a pooled browser once every slot is checked out
+BROWSER_ACQUIRE_TIMEOUT = 30
+
+class BrowserPool:
+    """
+    Keeps launched Chrome drivers warm so a new scraper session skips the
+    browser startup. Drivers are reset to about:blank on release instead of quit.
+    """
+
+    max_size = Config.BROWSER_POOL_SIZE
+    _idle = queue.Queue()
+    _lock = threading.Lock()
+    # Pool slot held by each live driver (keyed by id), so every browser gets its own profile directory
+    _slots = {}
+    _reserved = set()
+    # Drivers attached to a Chrome started outside the bot (keyed by id); discard leaves that browser running
+    _attached = set()
+
+    @classmethod
+    def acquire(cls, factory, timeout: float = BROWSER_ACQUIRE_TIMEOUT):
+        """
+        Return an idle driver, launching one with factory(slot) while under max_size. Once every
+        slot is checked out, wait up to timeout for a release and return None if none comes.
+        """
+        try:
+            return cls._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with cls._lock:
+            slot = next((i for i in range(cls.max_size) if i not in cls._reserved), None)
+            if slot is not None:
+                cls._reserved.add(slot)
+        if slot is not None:
+            driver = None
+            try:
+                driver = factory(slot)
+            finally:
+                with cls._lock:
+                    if driver is None:
+                        cls._reserved.discard(slot)
+                    else:
+                        cls._slots[id(driver)] = slot
+            return driver
+
+        try:
+            return cls._idle.get(timeout=timeout)
+        except queue.Empty:
+            logger.error(f"No browser became available within {timeout}s")
+            return None
+
+    @classmethod
+    def release(cls, driver, reset_cookies: bool = False):
+        """Return a driver to the pool; drivers that can't be reset are discarded"""
+        if driver is None:
+            return
+        try:
+            if reset_cookies:
+                driver.delete_all_cookies()
+            driver.get("about:blank")
+        except Exception as e:
+            logger.warning(f"Could not reset pooled browser, discarding it: {e}")
+            cls.discard(driver)
+            return
+        cls._idle.put(driver)
+        logger.info("Driver returned to browser pool")
+
+    @classmethod
+    def discard(cls, driver):
+        """Quit a driver for good and free its pool slot; attached browsers are only detached"""
+        with cls._lock:
+            slot = cls._slots.pop(id(driver), None)
+            if slot is not None:
+                cls._reserved.discard(slot)
+            attached = id(driver) in cls._attached
+            cls._attached.discard(id(driver))
+        if attached:
+            # Stop only our chromedriver so the external Chrome stays warm for the next attach
+            try:
+                driver.service.stop()
+                logger.info("Detached from externally started Chrome")
+            except Exception as e:
+                logger.error(f"Error stopping chromedriver for attached Chrome: {e}")
+            return
+        try:
+            driver.quit()
+            logger.info("Driver closed successfully")
+        except Exception as e:
+            logger.error(f"Error closing driver: {e}")
+            # Force kill chromedriver and the Chrome processes it spawned
+            try:
+                service = getattr(driver, 'service', None)
+                proc = getattr(service, 'process', None)
+                if proc:
+                    subprocess.run(["pkill", "-9", "-P", str(proc.pid)], check=False, timeout=2)
+                    os.kill(proc.pid, signal.SIGKILL)
+                    logger.info("Driver process killed")
+            except (OSError, subprocess.SubprocessError) as cleanup_error:
+                logger.error(f"Failed to force kill process: {cleanup_error}")
+
+    @classmethod
+    def mark_attached(cls, driver):
+        """Record that driver controls a Chrome the bot did not launch"""
+        with cls._lock:
+            cls._attached.add(id(driver))
+
+    @classmethod
+    def shutdown(cls):
+        """Quit every idle driver; called when the owner closes for good and at interpreter exit"""
+        while True:
+            try:
+                driver = cls._idle.get_nowait()
+            except queue.Empty:
+                break
+            cls.discard(driver)
+
+
+atexit.register(BrowserPool.shutdown)
+
+
 class Scraper:
-    def __init__(self, proxy: Optional[str] = None):
+    # chromedriver path from the first autoinstaller run, shared by every instance and retry
+    _driver_path = None
+    _driver_path_lock = threading.Lock()
+    # Formatted date prefix for screenshot filenames, refreshed when the day changes
+    _date_prefix_day = None
+    _date_prefix = ""
+
+    def __init__(self, proxy: Optional[str] = None, env: Optional[dict] = None):
         self.proxy = proxy
+        # Browser launch settings (HEADLESS_BROWSER, remote debugging); defaults to os.environ
+        self._env = os.environ if env is None else env
         self.driver = None
         self.auth = None
         self.tweets = None
+        self._notify_session = None
+        self._last_screenshot_fp = None
+        self._last_screenshot_path = None
+
+    def _attach_to_running_chrome(self, port: str) -> bool:
+        """
+        Connect to a Chrome already listening on the remote debugging port. Only a Chrome started
+        outside the bot (with --remote-debugging-port and its own --user-data-dir) survives a
+        restart to be attached to; it is detached, not quit, when the scraper closes.
+        """
+        try:
+            # Cheap probe first so a missing browser doesn't cost a chromedriver timeout
+            with socket.create_connection(("127.0.0.1", int(port)), timeout=0.5):
+                pass
+        except (OSError, ValueError):
+            return False
+        
+        try:
+            attach_options = Options()
+            attach_options.debugger_address = f"127.0.0.1:{port}"
+            self.driver = webdriver.Chrome(service=self._attach_service(), options=attach_options)
+            BrowserPool.mark_attached(self.driver)
+            logger.info(f"Attached to running Chrome on debugging port {port}")
+            return True
+        except Exception as e:
+            # Includes chromedriver resolution failures; the launch path has its own fallbacks
+            logger.info(f"Could not attach to running Chrome, starting a new one: {e}")
+            self.driver = None
+            return False
 
-    def _initialize_driver(self) -> bool:
+    def _attach_service(self) -> ChromeService:
+        """chromedriver for an attach, reusing the path resolved for launches when there is one"""
+        if Scraper._driver_path:
+            return ChromeService(Scraper._driver_path)
+        try:
+            return ChromeService(self._resolve_chromedriver_path())
+        except ImportError:
+            # No webdriver_manager; let Selenium locate chromedriver as the launch fallback does
+            return ChromeService()
+
+    @staticmethod
+    def _profile_dir(slot: int) -> Path:
+        """Chrome profile for a BrowserPool slot; slot 0 keeps the configured directory, slot N its -N sibling"""
+        profile_dir = Path(Config.CHROME_PROFILE_DIR).expanduser()
+        return profile_dir if slot == 0 else profile_dir.with_name(f"{profile_dir.name}-{slot}")
+
+    def _initialize_driver(self, slot: int = 0) -> bool:
         """Initialize Chrome driver with retry logic"""
+        # Reuse a warm browser when one is already running with remote debugging
+        if self._env.get("ENABLE_REMOTE_DEBUGGING", "false").lower() == "true":
+            if self._attach_to_running_chrome(self._env.get("REMOTE_DEBUGGING_PORT", "9222")):
+                self._configure_driver()
+                return True
+        
         attempts = 3
         for attempt in range(attempts):
             try:
                 chrome_options = Options()
                 chrome_options.add_argument("--start-maximized")
                 
+                # Trim background work the bot never needs and return from navigation
+                # once the DOM is interactive instead of waiting for every subresource
+                for argument in LEAN_CHROME_ARGUMENTS:
+                    chrome_options.add_argument(argument)
+                chrome_options.page_load_strategy = "eager"
                 # Always enable headless mode in production environments
-                headless = os.getenv("HEADLESS_BROWSER", "true").lower() == "true"
+                headless = self._env.get("HEADLESS_BROWSER", "true").lower() == "true"
                 if headless:
                     chrome_options.add_argument("--headless=new")  # Updated headless flag
                     chrome_options.add_argument("--disable-gpu")
@@ -41,14 +399,21 @@ class Scraper:
                     logger.info("Headless mode enabled with container settings")
                 
                 # Add remote debugging support
-                remote_debugging = os.getenv("ENABLE_REMOTE_DEBUGGING", "false").lower() == "true"
-                remote_debugging_port = os.getenv("REMOTE_DEBUGGING_PORT", "9222")
+                remote_debugging = self._env.get("ENABLE_REMOTE_DEBUGGING", "false").lower() == "true"
+                remote_debugging_port = self._env.get("REMOTE_DEBUGGING_PORT", "9222")
                 
                 if remote_debugging:
                     chrome_options.add_argument(f"--remote-debugging-port={remote_debugging_port}")
                     chrome_options.add_argument("--remote-debugging-address=0.0.0.0")
                     logger.info(f"Remote debugging enabled on port {remote_debugging_port}")
                 
+                # Reuse an on-disk profile so cookies and device trust survive restarts
+                if Config.CHROME_PROFILE_DIR:
+                    profile_dir = self._profile_dir(slot)
+                    profile_dir.mkdir(parents=True, exist_ok=True)
+                    chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+                    chrome_options.add_argument("--profile-directory=Default")
+                
                 if self.proxy and self.proxy.strip() and self.proxy.lower() != "proxy_url_if_needed":
                     chrome_options.add_argument(f'--proxy-server={self.proxy}')
                 
@@ -56,20 +421,23 @@ class Scraper:
                     # For Render and other cloud environments, use chromedriver-autoinstaller
                     try:
                         import chromedriver_autoinstaller
-                        chromedriver_autoinstaller.install()
-                        logger.info("Chrome driver installed automatically")
+                        with Scraper._driver_path_lock:
+                            if Scraper._driver_path is None:
+                                Scraper._driver_path = chromedriver_autoinstaller.install()
+                                logger.info("Chrome driver installed automatically")
                         
-                        self.driver = webdriver.Chrome(options=chrome_options)
+                        self.driver = webdriver.Chrome(
+                            service=ChromeService(Scraper._driver_path),
+                            options=chrome_options
+                        )
                         logger.info("Successfully initialized Chrome driver")
-                        return True
                         
                     except ImportError:
                         logger.warning("chromedriver_autoinstaller not found. Falling back to webdriver_manager")
                         # Try to use webdriver_manager if available
                         try:
-                            from webdriver_manager.chrome import ChromeDriverManager
                             self.driver = webdriver.Chrome(
-                                service=ChromeService(ChromeDriverManager().install()), 
+                                service=ChromeService(self._resolve_chromedriver_path()), 
                                 options=chrome_options
                             )
                             logger.info("Successfully initialized Chrome using WebDriver Manager")
@@ -79,11 +447,13 @@ class Scraper:
                             chrome_options.add_argument("--log-level=3")
                             self.driver = webdriver.Chrome(options=chrome_options)
                             logger.info("Successfully initialized Chrome using default configuration")
-                        return True
                         
                 except Exception as e:
                     logger.error(f"Failed to initialize Chrome driver: {e}")
-                    return False
+                    raise
+                
+                self._configure_driver()
+                return True
                     
             except Exception as e:
                 logger.error(f"Attempt {attempt + 1}/{attempts} failed: {e}")
@@ -92,29 +462,121 @@ class Scraper:
                         self.driver.quit()
                     except:
                         pass
-                if attempt == attempts - 1:
+                    self.driver = None
+                if attempt == attempts - 1 or not self._is_transient_launch_error(e):
                     return False
-                time.sleep(2)
+                time.sleep(0.5 * (2 ** attempt))
         return False
 
+    @staticmethod
+    def _is_transient_launch_error(error: Exception) -> bool:
+        """Whether a Chrome launch failure is worth retrying"""
+        # Missing binaries/packages, permissions and bad options fail the same way every time
+        if isinstance(error, (ImportError, PermissionError, FileNotFoundError, InvalidArgumentException)):
+            return False
+        if isinstance(error, WebDriverException):
+            message = str(error).lower()
+            return any(marker in message for marker in TRANSIENT_LAUNCH_ERRORS)
+        return True
+
+    @staticmethod
+    def _installed_chrome_version() -> Optional[str]:
+        """Return the installed Chrome version string, or None if it can't be determined"""
+        for binary in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser"):
+            try:
+                return subprocess.check_output([binary, "--version"], text=True, timeout=5).strip()
+            except (OSError, subprocess.SubprocessError):
+                continue
+        return None
+
+    def _resolve_chromedriver_path(self) -> str:
+        """Return a chromedriver path, reusing the last install while Chrome's version is unchanged"""
+        chrome_version = self._installed_chrome_version()
+        if chrome_version:
+            try:
+                cached = json.loads(CHROMEDRIVER_CACHE_FILE.read_text())
+                if cached.get("chrome_version") == chrome_version and os.path.exists(cached.get("driver_path", "")):
+                    logger.info(f"Using cached chromedriver at {cached['driver_path']}")
+                    return cached["driver_path"]
+            except (OSError, ValueError):
+                pass
+        
+        from webdriver_manager.chrome import ChromeDriverManager
+        driver_path = ChromeDriverManager().install()
+        
+        if chrome_version:
+            try:
+                CHROMEDRIVER_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+                CHROMEDRIVER_CACHE_FILE.write_text(json.dumps({
+                    "chrome_version": chrome_version,
+                    "driver_path": driver_path,
+                    "mtime": os.path.getmtime(driver_path)
+                }))
+            except OSError as e:
+                logger.warning(f"Could not write chromedriver cache: {e}")
+        return driver_path
+
+    def _configure_driver(self):
+        """Apply per-session settings to a freshly created driver"""
+        # Negative probes must return immediately; blocking waits are explicit WebDriverWaits
+        self.driver.implicitly_wait(0)
+        if Config.BLOCK_MEDIA:
+            self._set_media_blocking(True)
+
+    def _set_media_blocking(self, enabled: bool):
+        """Block or unblock images, fonts and media through the DevTools protocol"""
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd(
+                "Network.setBlockedURLs",
+                {"urls": list(BLOCKED_MEDIA_URLS) if enabled else []}
+            )
+        except Exception as e:
+            logger.warning(f"Could not update media blocking: {e}")
+
+    def _reload_images(self):
+        """Fetch images that were blocked before the page was captured"""
+        try:
+            self.driver.execute_cdp_cmd("Runtime.evaluate", {
+                "expression": RELOAD_IMAGES_EXPR % SCREENSHOT_IMAGE_WAIT_MS,
+                "awaitPromise": True,
+                "returnByValue": True
+            })
+        except Exception as e:
+            logger.warning(f"Could not reload images for screenshot: {e}")
+
+    def _launch_driver(self, slot: int = 0):
+        """Pool factory: start a new Chrome for a pool slot and return it, or None on failure"""
+        return self.driver if self._initialize_driver(slot) else None
+
     def initialize(self) -> bool:
         """Initialize the scraper and authenticate with retry logic"""
         try:
-            if not self._initialize_driver():
+            # Read the saved session from disk while a browser is acquired or started
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                driver_future = executor.submit(BrowserPool.acquire, self._launch_driver)
+                cookies_future = executor.submit(Authenticator.load_cookies_static, Authenticator.SESSION_FILE)
+                self.driver = driver_future.result()
+                cookies = cookies_future.result()
+            
+            if not self.driver:
                 logger.error("Failed to initialize driver")
                 return False
                 
-            self.auth = Authenticator(self.driver)
-            self.tweets = TweetManager(self.driver)
-            
-            # Try to load session
-            if not self.auth.load_session():
-                logger.info("No valid session found, attempting login...")
-                if not self.auth.login():
-                    # Note: We don't handle verification here anymore
-                    # That's handled separately to avoid circular dependency
-                    logger.error("Login failed")
-                    return False
+            # Keep the managers across re-initialization while they drive the same browser
+            if self.auth is None or self.auth.driver is not self.driver:
+                self.auth = Authenticator(self.driver, prefetched_cookies=cookies)
+            else:
+                self.auth._prefetched_cookies = cookies
+            if self.tweets is None or self.tweets.driver is not self.driver:
+                self.tweets = TweetManager(self.driver)
+            
+            # login() tries the saved session first and only logs in if it is invalid
+            if not self.auth.login():
+                # Note: We don't handle verification here anymore
+                # That's handled separately to avoid circular dependency
+                logger.error("Login failed")
+                return False
             
             logger.info("Scraper initialized successfully")
             return True
@@ -122,72 +584,70 @@ class Scraper:
         except Exception as e:
             logger.error(f"Error initializing scraper: {e}")
             if self.driver:
-                try:
-                    self.driver.quit()
-                except:
-                    pass
+                BrowserPool.discard(self.driver)
+                self.driver = None
             return False
 
-    def close(self):
-        """Close the scraper and cleanup resources"""
-        try:
-            if self.driver:
-                self.driver.quit()
-                logger.info("Driver closed successfully")
-        except Exception as e:
-            logger.error(f"Error closing driver: {e}")
-            # Try to force kill if needed
-            try:
-                try:
-                    import psutil
-                    process = psutil.Process(self.driver.service.process.pid)
-                    process.kill()
-                    logger.info("Process killed using psutil")
-                except ImportError:
-                    logger.warning("psutil not found. Please install with: pip install psutil")
-                    # Fallback to os._exit in extreme cases
-                    logger.warning("Using fallback cleanup method")
-                    if hasattr(self.driver, 'service') and hasattr(self.driver.service, 'process'):
-                        os.kill(self.driver.service.process.pid, 9)
-                        logger.info("Process killed using os.kill")
-            except Exception as cleanup_error:
-                logger.error(f"Failed to force kill process: {cleanup_error}")
+    def close(self, keep_browser: bool = False):
+        """
+        Quit the browser, or with keep_browser hand it back to the pool for the next session.
+        Only callers about to acquire a browser again should keep it.
+        """
+        if self.driver:
+            if keep_browser:
+                BrowserPool.release(self.driver)
+            else:
+                BrowserPool.discard(self.driver)
+            self.driver = None
 
     def is_verification_screen(self):
         """Detect if current page is a verification screen asking for code or email"""
         try:
-            # Look for verification elements with a short timeout
-            verification_texts = [
-                "Sieh in deiner E-Mail nach",  # German
-                "Check your email",            # English
-                "Bestätigungscode",            # German
-                "verification code",           # English
-                "Gib deine Telefonnummer oder E-Mail-Adresse ein",  # German email verification
-                "Enter your phone number or email address",         # English email verification
-                "Hilf uns, deinen Account sicher zu halten",        # German account security
-                "Verifiziere deine Identität"                       # German identity verification
-            ]
-            
-            for text in verification_texts:
-                elements = self.driver.find_elements("xpath", f"//*[contains(text(), '{text}')]")
-                if elements:
-                    return True
-                
-            # Check for verification input field
-            code_fields = self.driver.find_elements("xpath", "//input[contains(@placeholder, 'code') or contains(@placeholder, 'Code')]")
-            if code_fields:
-                return True
-            
-            # Check for email verification input field
-            email_fields = self.driver.find_elements("xpath", "//input[@data-testid='ocfEnterTextTextInput']")
-            if email_fields:
-                return True
-            
-            return False
+            try:
+                # Evaluate over CDP directly, skipping the WebDriver command translation
+                result = self.driver.execute_cdp_cmd(
+                    "Runtime.evaluate", {"expression": VERIFICATION_SCREEN_EXPR, "returnByValue": True}
+                )
+                return bool(result["result"].get("value"))
+            except (WebDriverException, AttributeError):
+                # Remote drivers without CDP support
+                return bool(self.driver.execute_script(VERIFICATION_SCREEN_JS))
         except Exception as e:
             logger.error(f"Error checking for verification screen: {e}")
             return False
 
+    def _get_notify_session(self) -> requests.Session:
+        """Return the HTTP session used for admin notifications, creating it on first use"""
+        if self._notify_session is None:
+            # No retries: each URL gets the single attempt a bare requests.post made, so an
+            # unreachable fallback URL doesn't delay the wait for the code
+            adapter = HTTPAdapter()
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._notify_session = session
+        return self._notify_session
+
+    def _verification_done(self) -> bool:
+        """Read the in-page verification flag, reinstalling the observer after a navigation"""
+        done = self.driver.execute_script(VERIFICATION_DONE_JS)
+        if done is None:
+            done = self.driver.execute_script(VERIFICATION_WATCH_JS)
+        return bool(done)
+
+    def _wait_for_verification_exit(self, pre_html_len: Optional[int] = None) -> bool:
+        """Wait briefly for the page to react to a submit; True once the verification screen is gone"""
+        def page_changed(driver):
+            if not self.is_verification_screen():
+                return True
+            return pre_html_len is not None and driver.execute_script(PAGE_LENGTH_JS) != pre_html_len
+        
+        try:
+            WebDriverWait(self.driver, SHORT_WAIT_TIMEOUT, poll_frequency=SHORT_WAIT_POLL).until(page_changed)
+        except TimeoutException:
+            pass
+        return not self.is_verification_screen()
+
     def handle_verification_screen(self, timeout_minutes=30):
         """Handle the verification screen by notifying admin and waiting for code entry"""
         try:
@@ -198,86 +658,41 @@ class Scraper:
             
             # Try to clean up old verifications with robust error handling
             try:
-                from src.verification_manager import VerificationManager
-                try:
-                    VerificationManager.reset_verifications_file()  # Force reset to clear any corrupted state
-                    logger.info("Reset verification file to clean state")
-                except Exception as reset_error:
-                    logger.error(f"Error resetting verification file: {reset_error}")
-            except Exception as clean_error:
-                logger.error(f"Error during verification cleanup: {clean_error}")
+                VerificationManager.reset_verifications_file()  # Force reset to clear any corrupted state
+                logger.info("Reset verification file to clean state")
+            except Exception as reset_error:
+                logger.error(f"Error resetting verification file: {reset_error}")
                 # Continue anyway
             
             # Check if it's an email verification screen first
-            email_verification_texts = [
-                "Gib deine Telefonnummer oder E-Mail-Adresse ein",
-                "Enter your phone number or email address"
-            ]
-            
-            for text in email_verification_texts:
-                elements = self.driver.find_elements("xpath", f"//*[contains(text(), '{text}')]")
-                if elements:
-                    logger.info("Detected email verification screen")
+            if self.driver.find_elements("xpath", EMAIL_VERIFICATION_XPATH):
+                logger.info("Detected email verification screen")
+                
+                # Get the email from config
+                email = Config.TWITTER_EMAIL
+                
+                # Find the input field
+                try:
+                    input_field = self.driver.find_element(*OCF_INPUT)
+                    input_field.clear()
+                    input_field.send_keys(email)
+                    logger.info(f"Entered email: {email}")
+                    pre_html_len = self.driver.execute_script(PAGE_LENGTH_JS)
                     
-                    # Get the email from config
-                    from src.config import Config
-                    email = Config.TWITTER_EMAIL
+                    # Locate the continue button in one script call; press Enter if there is none
+                    continue_button = self.driver.execute_script(CONTINUE_BUTTON_JS)
+                    if continue_button:
+                        continue_button.click()
+                        logger.info("Clicked continue button after entering email")
+                    else:
+                        input_field.send_keys(Keys.RETURN)
+                        logger.info("Pressed Enter key after entering email")
                     
-                    # Find the input field
-                    try:
-                        input_field = self.driver.find_element("xpath", "//input[@data-testid='ocfEnterTextTextInput']")
-                        if input_field:
-                            input_field.clear()
-                            input_field.send_keys(email)
-                            logger.info(f"Entered email: {email}")
-                            
-                            # Find and click the continue button
-                            try:
-                                continue_button = self.driver.find_element("xpath", "//button[@data-testid='ocfEnterTextNextButton']")
-                                if continue_button:
-                                    continue_button.click()
-                                    logger.info("Clicked continue button after entering email")
-                                    time.sleep(3)
-                                    
-                                    # Check if verification screen is still present
-                                    if not self.is_verification_screen():
-                                        logger.info("Email verification completed successfully")
-                                        return True
-                                else:
-                                    # Try with role and text
-                                    try:
-                                        continue_button = self.driver.find_element("xpath", "//button[@role='button']//span[contains(text(), 'Weiter')]/..")
-                                        continue_button.click()
-                                        logger.info("Clicked continue button after entering email (using text)")
-                                        time.sleep(3)
-                                        
-                                        if not self.is_verification_screen():
-                                            logger.info("Email verification completed successfully")
-                                            return True
-                                    except:
-                                        # Try English button text
-                                        try:
-                                            continue_button = self.driver.find_element("xpath", "//button[@role='button']//span[contains(text(), 'Next')]/..")
-                                            continue_button.click()
-                                            logger.info("Clicked continue button after entering email (using English text)")
-                                            time.sleep(3)
-                                            
-                                            if not self.is_verification_screen():
-                                                logger.info("Email verification completed successfully")
-                                                return True
-                                        except:
-                                            # Try to press Enter key if button not found
-                                            input_field.send_keys(Keys.RETURN)
-                                            logger.info("Pressed Enter key after entering email")
-                                            time.sleep(3)
-                                            
-                                            if not self.is_verification_screen():
-                                                logger.info("Email verification completed successfully")
-                                                return True
-                            except Exception as e:
-                                logger.error(f"Error clicking continue button: {e}")
-                    except Exception as e:
-                        logger.error(f"Error finding input field: {e}")
+                    if self._wait_for_verification_exit(pre_html_len):
+                        logger.info("Email verification completed successfully")
+                        return True
+                except Exception as e:
+                    logger.error(f"Error submitting email verification: {e}")
             
             # If we're still here, it's a code verification or other type
             # Proceed with the original verification handling
@@ -288,22 +703,13 @@ class Scraper:
             verification_id = f"verify_{int(time.time())}"
             
             # Store verification status in global registry
-            from src.verification_manager import VerificationManager
             VerificationManager.register_verification(
                 verification_id=verification_id,
                 screenshot_path=screenshot_path,
                 driver=self.driver
             )
             
-            # Get admin URL - first try environment variable, then fallback to localhost
-            admin_base_url = os.environ.get("ADMIN_BASE_URL", "http://localhost:5000")
-            
-            # For Docker environment, always use localhost
-            if os.environ.get("DOCKER_ENV") == "true":
-                admin_base_url = "http://localhost:5000"
-                
-            # Define verification_url here before using it
-            verification_url = f"{admin_base_url}/admin/verification/{verification_id}"
+            verification_url = f"{ADMIN_BASE_URL}/admin/verification/{verification_id}"
             
             # Send multiple notifications to ensure at least one gets through
             notification_messages = [
@@ -312,28 +718,16 @@ class Scraper:
                 f"Verification required: Please check {verification_url} to complete Twitter login"
             ]
             
-            # Try multiple notification URLs with multiple messages
-            notification_urls = [
-                "http://localhost:5000/api/admin/notifications",
-                os.environ.get("NOTIFICATION_URL", ""),
-                os.environ.get("INTERNAL_NOTIFICATION_URL", ""),
-                "http://127.0.0.1:5000/api/admin/notifications",
-                "http://web-interface:5000/api/admin/notifications"
-            ]
-            
-            # Filter out empty URLs
-            notification_urls = [url for url in notification_urls if url]
-            
             # Try to send notifications using all URLs and messages
             try:
-                import requests
+                notify_session = self._get_notify_session()
                 success = False
                 
-                for notification_url in notification_urls:
+                for notification_url in NOTIFICATION_URLS:
                     for message in notification_messages:
                         try:
                             logger.info(f"Sending notification to: {notification_url}")
-                            response = requests.post(
+                            response = notify_session.post(
                                 notification_url,
                                 json={"message": message, "type": "urgent", "verification_id": verification_id},
                                 timeout=5
@@ -356,31 +750,49 @@ class Scraper:
             
             # Wait for code entry with periodic checks - IMPROVED ERROR HANDLING
             logger.warning(f"Waiting up to {timeout_minutes} minutes for verification code to be entered")
-            max_attempts = timeout_minutes * 6  # Check every 10 seconds
+            try:
+                self.driver.execute_script(VERIFICATION_WATCH_JS)
+            except Exception as watch_error:
+                logger.warning(f"Could not install verification observer: {watch_error}")
             
-            for attempt in range(max_attempts):
-                # Safely check if verification was completed
+            start_time = time.monotonic()
+            last_reminder_minute = 0
+            
+            def verification_finished(driver):
+                nonlocal last_reminder_minute
+                # Every minute, remind about the verification
+                minutes_passed = int((time.monotonic() - start_time) // 60)
+                if minutes_passed > last_reminder_minute:
+                    last_reminder_minute = minutes_passed
+                    logger.warning(f"Still waiting for verification code ({minutes_passed}/{timeout_minutes} minutes passed)")
+                
+                # Safely check if verification was completed - don't crash the wait
                 try:
                     if VerificationManager.is_verification_completed(verification_id):
-                        logger.info("Verification completed successfully via admin panel")
-                        return True
-                    
-                    # Check if verification screen is still present
-                    if not self.is_verification_screen():
-                        logger.info("Verification completed successfully")
-                        VerificationManager.complete_verification(verification_id)
-                        return True
+                        return "admin"
+                    if self._verification_done():
+                        return "screen"
                 except Exception as check_error:
                     logger.error(f"Error checking verification status: {check_error}")
-                    # Continue the loop - don't crash
-                
-                # Every minute, remind about the verification
-                if attempt % 6 == 0 and attempt > 0:
-                    minutes_passed = attempt // 6
-                    logger.warning(f"Still waiting for verification code ({minutes_passed}/{timeout_minutes} minutes passed)")
-                
-                # Sleep for 10 seconds before checking again
-                time.sleep(10)
+                return False
+            
+            try:
+                outcome = WebDriverWait(
+                    self.driver,
+                    timeout_minutes * 60,
+                    poll_frequency=2,
+                    ignored_exceptions=(StaleElementReferenceException,)
+                ).until(verification_finished)
+            except TimeoutException:
+                outcome = None
+            
+            if outcome == "admin":
+                logger.info("Verification completed successfully via admin panel")
+                return True
+            if outcome == "screen":
+                logger.info("Verification completed successfully")
+                VerificationManager.complete_verification(verification_id)
+                return True
             
             # If we got here, timeout occurred
             logger.error(f"Verification timeout after {timeout_minutes} minutes")
@@ -395,28 +807,52 @@ class Scraper:
             # Don't crash - return False to indicate failure
             return False
 
+    @classmethod
+    def _screenshot_timestamp(cls) -> str:
+        """Return YYYYmmdd_HHMMSS, formatting the date part only when the day changes"""
+        now = datetime.now()
+        today = now.date()
+        if today != cls._date_prefix_day:
+            cls._date_prefix_day = today
+            cls._date_prefix = today.strftime("%Y%m%d")
+        return f"{cls._date_prefix}_{now:%H%M%S}"
+
     def _capture_verification_screenshot(self):
         """Capture a screenshot of the verification screen"""
         try:
-            # Use the shared volume in Docker environments
-            if os.environ.get("DOCKER_ENV") == "true":
-                screenshots_dir = Path("/app/static/screenshots")
-            else:
-                screenshots_dir = Path(__file__).parent.parent.parent / "static" / "screenshots"
-            
-            screenshots_dir.mkdir(parents=True, exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"verification_{timestamp}.png"
-            filepath = screenshots_dir / filename
-            
-            if self.driver.save_screenshot(str(filepath)):
-                logger.info(f"Screenshot saved to {filepath}")
-                # Return a path relative to static folder for web access
-                return f"/static/screenshots/{filename}"
-            else:
-                logger.error("Failed to save screenshot")
-                return None
+            # Reuse the previous file while the page is unchanged
+            fingerprint = self.driver.execute_script(SCREENSHOT_FINGERPRINT_JS)
+            if fingerprint == self._last_screenshot_fp and self._last_screenshot_path:
+                logger.info("Verification page unchanged, reusing previous screenshot")
+                return self._last_screenshot_path
+            
+            filename = f"verification_{self._screenshot_timestamp()}.jpg"
+            filepath = _SCREENSHOT_DIR / filename
+            
+            # Media is blocked over CDP only, so unblocking and re-requesting the
+            # failed images gives the admin a complete screenshot
+            if Config.BLOCK_MEDIA:
+                self._set_media_blocking(False)
+            try:
+                if Config.BLOCK_MEDIA:
+                    self._reload_images()
+                # Chrome encodes JPEG directly, which is much cheaper than PNG and
+                # several times smaller over the chromedriver connection
+                result = self.driver.execute_cdp_cmd("Page.captureScreenshot", {
+                    "format": "jpeg",
+                    "quality": SCREENSHOT_JPEG_QUALITY,
+                    "captureBeyondViewport": False
+                })
+                filepath.write_bytes(base64.b64decode(result["data"]))
+            finally:
+                if Config.BLOCK_MEDIA:
+                    self._set_media_blocking(True)
+            
+            logger.info(f"Screenshot saved to {filepath}")
+            # Return a path relative to static folder for web access
+            self._last_screenshot_fp = fingerprint
+            self._last_screenshot_path = f"/static/screenshots/{filename}"
+            return self._last_screenshot_path
         except Exception as e:
             logger.error(f"Error capturing screenshot: {e}")
             return None
@@ -428,79 +864,26 @@ class Scraper:
                 logger.error("Invalid verification code")
                 return False
             
-            # Find and fill the verification code input field
-            input_field = None
-            
-            # Try different selectors for the input field
-            selectors = [
-                "input[name='text']", 
-                "input[placeholder*='code']",
-                "input[placeholder*='Code']"
-            ]
-            
-            for selector in selectors:
-                try:
-                    input_field = self.driver.find_element("css selector", selector)
-                    if input_field:
-                        break
-                except:
-                    continue
-                
+            # Find the input field and submit button in a single round-trip
+            input_field, submit_button = self.driver.execute_script(VERIFICATION_FORM_JS)
             if not input_field:
                 logger.error("Could not find verification code input field")
                 return False
+            if not submit_button:
+                logger.error("Could not find submit button")
+                return False
             
             # Clear field and enter code
             input_field.clear()
             input_field.send_keys(code)
-            
-            # Find and click submit button
-            submit_button = None
-            
-            # Try different selectors for the submit button
-            button_selectors = [
-                "button[data-testid='ocfEnterTextNextButton']",  # Add the specific data-testid
-                "button:contains('Next')",
-                "button:contains('Verify')",
-                "button:contains('Submit')",
-                "button:contains('Continue')",
-                "button:contains('Weiter')"  # German "Continue"
-            ]
-            
-            # First try to find by data-testid which is most reliable
-            try:
-                submit_button = self.driver.find_element("css selector", "button[data-testid='ocfEnterTextNextButton']")
-            except:
-                # If that fails, try other methods
-                for selector in button_selectors:
-                    try:
-                        if selector.startswith("button:contains"):
-                            # For :contains selectors, we need to use a different approach
-                            text = selector.split("'")[1]
-                            elements = self.driver.find_elements("xpath", f"//button[contains(., '{text}')]")
-                            if elements:
-                                submit_button = elements[0]
-                                break
-                        else:
-                            submit_button = self.driver.find_element("css selector", selector)
-                            if submit_button:
-                                break
-                    except:
-                        continue
-                
-            if not submit_button:
-                logger.error("Could not find submit button")
-                return False
+            pre_html_len = self.driver.execute_script(PAGE_LENGTH_JS)
             
             # Click the button
             submit_button.click()
             logger.info("Verification code submitted")
             
-            # Wait a moment for the submission to process
-            time.sleep(3)
-            
-            # Check if verification screen is still present
-            if not self.is_verification_screen():
+            # Wait for the page to react, then check if verification screen is still present
+            if self._wait_for_verification_exit(pre_html_len):
                 logger.info("Verification successful")
                 return True
             else:
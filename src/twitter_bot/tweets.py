@@ -9,6 +9,18 @@ import logging
 from pathlib import Path
 from src.database.supabase_client import DatabaseService
 import re
+from functools import lru_cache
+from urllib.parse import urlparse
+
+# Characters at or above U+FFFF, which the tweet composer can't take
+_NON_BMP = re.compile("[\uffff-\U0010ffff]")
+
+
+@lru_cache(maxsize=8)
+def _self_mention_pattern(username: str) -> re.Pattern:
+    """Compiled @username matcher, built once per username"""
+    return re.compile(f"@{re.escape(username)}\\b", re.IGNORECASE)
+
 
 class TweetManager:
     def __init__(self, driver: WebDriver):
@@ -122,10 +134,11 @@ class TweetManager:
             try:
                 self.logger.info(f"Attempt {attempt + 1} to send tweet...")
                 
-                # Navigate to home page
-                self.logger.info("Navigating to home page...")
-                self.driver.get("https://twitter.com/home")
-                time.sleep(3)
+                # Navigate to home page, unless a previous tweet left us there
+                if attempt > 0 or urlparse(self.driver.current_url).path != "/home":
+                    self.logger.info("Navigating to home page...")
+                    self.driver.get("https://twitter.com/home")
+                    time.sleep(3)
                 
                 # Core working selectors from proven implementation
                 tweet_box_selectors = [
@@ -222,7 +235,7 @@ class TweetManager:
     def sanitize_text(self, text: str) -> str:
         """Sanitize text"""
         text = self.clean_content(text)
-        return ''.join(char for char in text if ord(char) < 0xFFFF)
+        return _NON_BMP.sub('', text)
 
     def reply_to_tweet(self, tweet_data: dict, content: str) -> None:
         """Reply to a tweet"""
@@ -235,7 +248,7 @@ class TweetManager:
             username = os.getenv("TWITTER_USERNAME", "agent47ai").lower()
             
             # Remove @username mentions from the reply content
-            content = re.sub(f"@{username}\\b", "", content, flags=re.IGNORECASE)
+            content = _self_mention_pattern(username).sub("", content)
             content = content.strip()
             
             self.logger.info(f"Replying with content: {content}")
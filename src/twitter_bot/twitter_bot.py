@@ -1,55 +1,89 @@
 # src/twitter_bot/twitter_bot.py
 
+import asyncio
 import logging
-import time
 import random
-from datetime import datetime
+from collections import deque
+from functools import cached_property, lru_cache
 from pathlib import Path
-import json
 import os
 from dotenv import load_dotenv
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from src.ai_generator import AIGenerator
-from .scraper import Scraper
-from .tweets import TweetManager
 from src.announcement_broadcaster import AnnouncementBroadcaster
-from .twitter_service import twitter_service
+from .twitter_service import get_twitter_service
 from src.config import Config
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('TwitterBot')
 
+# Project .env file, loaded on first initialize() outside Docker
+ENV_PATH = Path(__file__).parent.parent.parent / '.env'
+
+# Seconds between mention checks
+NOTIFICATION_INTERVAL = 300
+# Tweet intervals computed per refill of the schedule
+TWEET_SCHEDULE_BATCH = 16
+# Verification screen probe interval bounds (seconds); grows by 1.5x while the screen is absent
+VERIFY_BACKOFF_MIN = 30.0
+VERIFY_BACKOFF_MAX = 300.0
+
+
+# Seconds to wait after a loop error, by exception class (first match wins)
+_BACKOFF = {
+    TimeoutException: 1,
+    WebDriverException: 5,
+    ConnectionError: 30
+}
+_DEFAULT_BACKOFF = 10
+
+
+def _backoff_for(error: Exception) -> float:
+    """Return how long a bot loop should pause after error"""
+    return next((delay for cls, delay in _BACKOFF.items() if isinstance(error, cls)), _DEFAULT_BACKOFF)
+
+
+@lru_cache(maxsize=1)
+def _load_env_once(env_path: Path):
+    """Load the project .env file once per process (skipped in Docker)"""
+    # In Docker, environment variables are passed directly
+    if os.environ.get("DOCKER_ENV") == "true":
+        logger.info("Running in Docker environment, using container environment variables...")
+        return
+    
+    logger.info("Loading environment variables from .env file...")
+    try:
+        if not load_dotenv(dotenv_path=env_path, override=True):
+            logger.warning("Could not load .env file from %s, but continuing anyway...", env_path)
+    except Exception as e:
+        logger.warning("Error loading .env file: %s, continuing with environment variables only...", e)
+
+
 class TwitterBot:
     def __init__(self, handle_signals=False, initialize_now=True):
         logger.info("Initializing Twitter bot...")
         
-        # Get the absolute path to the .env file
-        project_root = Path(__file__).parent.parent.parent
-        env_path = project_root / '.env'
-        
-        # Check if we're in a Docker environment
-        in_docker = os.environ.get("DOCKER_ENV") == "true"
-        
-        # Only try to load the .env file if not in Docker environment
-        # In Docker, environment variables are passed directly
-        if not in_docker:
-            logger.info("Loading environment variables from .env file...")
-            try:
-                if not load_dotenv(dotenv_path=env_path, override=True):
-                    logger.warning(f"Could not load .env file from {env_path}, but continuing anyway...")
-            except Exception as e:
-                logger.warning(f"Error loading .env file: {e}, continuing with environment variables only...")
-        else:
-            logger.info("Running in Docker environment, using container environment variables...")
-        
-        # Initialize components
-        self.generator = AIGenerator(mode='twitter')
-        self.proxy = os.getenv("PROXY_URL")
+        self.proxy = None
+        self._subprocess_env = None
+        # Crypto news tweets need the OpenAI key; checked once per boot
+        self._news_enabled = bool(getattr(Config, "OPENAI_API_KEY", None))
+        if not self._news_enabled:
+            logger.warning("OpenAI API key not configured, using standard content generation")
         self.running = False
         self.is_cleaning_up = False
+        self._stop_event = None
+        self._reinit_lock = None
+        self._loop = None
+        self._tweet_manager = None
+        self._verify_backoff = VERIFY_BACKOFF_MIN
+        # Tweet intervals; set TWEET_SCHEDULE_SEED for a reproducible schedule
+        seed = os.getenv("TWEET_SCHEDULE_SEED")
+        self._schedule_rng = random.Random(int(seed) if seed else None)
+        self._tweet_schedule = deque()
         
         # Reference to the twitter service (not creating our own anymore)
-        self.service = twitter_service
+        self.service = get_twitter_service()
         
         # Only initialize if requested
         if initialize_now:
@@ -57,24 +91,38 @@ class TwitterBot:
         
         logger.info("Twitter bot initialization complete!")
 
+    @cached_property
+    def generator(self) -> AIGenerator:
+        """AI generator, created on first use"""
+        return AIGenerator(mode='twitter')
+
     def initialize(self) -> bool:
         """Initialize the Twitter bot components"""
         try:
+            _load_env_once(ENV_PATH)
+            self.proxy = os.getenv("PROXY_URL")
+            if self._subprocess_env is None:
+                # Browser launch settings, snapshotted once instead of mutating os.environ.
+                # The main bot uses the default debugging port and is always headless in Docker.
+                self._subprocess_env = {k: v for k, v in os.environ.items() if k != "REMOTE_DEBUGGING_PORT"}
+                if os.environ.get("DOCKER_ENV") == "true":
+                    self._subprocess_env["HEADLESS_BROWSER"] = "true"
+            
             if not self.generator:
                 logger.error("AI Generator not initialized")
                 return False
 
             # Initialize the twitter service
             if not self.service.is_initialized():
-                # For docker environment ensure headless is set
-                if os.environ.get("DOCKER_ENV") == "true":
-                    os.environ["HEADLESS_BROWSER"] = "true"
-                
-                # For the main bot, use default port
-                os.environ.pop("REMOTE_DEBUGGING_PORT", None)  # Remove if set
-                
-                # Initialize the service
-                initialization_success = self.service.initialize(proxy_url=self.proxy)
+                # Initialize the service; after a runtime loss, reuse a pooled browser
+                if self._tweet_manager is not None:
+                    initialization_success = self.service.acquire_driver(
+                        proxy_url=self.proxy, env=self._subprocess_env
+                    )
+                else:
+                    initialization_success = self.service.initialize(
+                        proxy_url=self.proxy, env=self._subprocess_env
+                    )
                 
                 if not initialization_success:
                     logger.error("Failed to initialize Twitter service")
@@ -82,7 +130,6 @@ class TwitterBot:
             
             # Set up broadcaster with the service's driver
             if self.service.driver:
-                from src.announcement_broadcaster import AnnouncementBroadcaster
                 AnnouncementBroadcaster.set_twitter_driver(self.service.driver)
                 
             # Initialize crypto news database if we have an AI generator
@@ -90,22 +137,29 @@ class TwitterBot:
                 try:
                     self.generator.initialize_crypto_news()
                 except Exception as e:
-                    logger.error(f"Failed to initialize crypto news: {e}")
+                    logger.error("Failed to initialize crypto news: %s", e)
             
             # Verify all components
-            if not all([self.generator, self.service.is_initialized()]):
+            ready = self.service.is_initialized()
+            if not (self.generator and ready):
                 logger.error("Not all components initialized properly")
                 return False
                 
+            # Cached until the next (re)initialization
+            self._tweet_manager = self.service.get_tweet_manager()
             logger.info("All components initialized successfully")
             return True
             
         except Exception as e:
-            logger.error(f"Error initializing Twitter bot: {e}")
+            logger.error("Error initializing Twitter bot: %s", e)
             return False
 
     def run(self):
-        """Run the main loop of the Twitter bot"""
+        """Run the bot until stopped (blocking wrapper around run_async)"""
+        asyncio.run(self.run_async())
+
+    async def run_async(self):
+        """Run the main loop of the Twitter bot as cooperating asyncio tasks"""
         try:
             logger.info("Initializing Twitter bot components...")
             if not self.initialize():
@@ -113,165 +167,220 @@ class TwitterBot:
                 return
 
             logger.info("Twitter bot initialized successfully!")
+            self._loop = asyncio.get_running_loop()
+            self._stop_event = asyncio.Event()
+            self._reinit_lock = asyncio.Lock()
             self.running = True
             
             # Execute initial tasks
             logger.info("=== Initial Tasks ===")
-            if self.service.get_tweet_manager() and self.generator:
-                self.service.get_tweet_manager().check_and_process_mentions(self.generator)
-                self.generate_and_send_tweet()
+            tweet_manager = self._tweet_manager
+            if tweet_manager and self.generator:
+                # Independent of each other, so run them side by side
+                results = await asyncio.gather(
+                    asyncio.wrap_future(self.service.submit("check_and_process_mentions", self.generator)),
+                    self.generate_and_send_tweet(),
+                    return_exceptions=True
+                )
+                for task_name, result in zip(("mention check", "initial tweet"), results):
+                    if isinstance(result, Exception):
+                        logger.error("Initial %s failed: %s", task_name, result)
             
-            # Set timers
-            last_tweet_time = time.time()
-            last_notification_check = time.time()
-            tweet_interval = random.randint(60, 1200)  # 5-30 minutes
-            notification_interval = 300  # 5 minutes
-
-            logger.info(f"Next tweet in {tweet_interval/60:.1f} minutes")
-            logger.info(f"Next notification check in {notification_interval/60:.1f} minutes")
-
-            while self.running:
-                try:
-                    if not all([self.generator, self.service.is_initialized()]):
-                        logger.error("Critical components lost during runtime")
-                        if not self.initialize():  # Try to reinitialize
-                            logger.error("Could not recover components")
-                            break
-
-                    current_time = time.time()
-
-                    if self.is_cleaning_up:
-                        logger.info("Cleanup in progress. Exiting run loop.")
-                        break
-
-                    # Check notifications
-                    if current_time - last_notification_check >= notification_interval:
-                        logger.info("=== Checking Notifications ===")
-                        tweet_manager = self.service.get_tweet_manager()
-                        if tweet_manager and self.generator:
-                            try:
-                                tweet_manager.check_and_process_mentions(self.generator)
-                            except Exception as e:
-                                logger.error(f"Error checking notifications: {e}")
-                        last_notification_check = current_time
-                        logger.info(f"Next notification check in {notification_interval/60:.1f} minutes")
-
-                    # Check for verification screens periodically
-                    if self.service.scraper and self.service.scraper.is_verification_screen():
-                        logger.warning("Verification screen detected during operation")
-                        verification_success = self.service.scraper.handle_verification_screen()
-                        
-                        if verification_success:
-                            logger.info("Verification completed, continuing normal operation")
-                        else:
-                            logger.warning("Verification failed or timed out, will retry on next cycle")
-                            
-                        # Skip the rest of this cycle
-                        continue
-
-                    # Post tweets
-                    if current_time - last_tweet_time >= tweet_interval:
-                        logger.info("=== Generating Tweet ===")
-                        try:
-                            self.generate_and_send_tweet()
-                        except Exception as e:
-                            logger.error(f"Error generating tweet: {e}")
-                        last_tweet_time = current_time
-                        tweet_interval = random.randint(2600, 3600)
-                        logger.info(f"Next tweet in {tweet_interval/60:.1f} minutes")
-
-                    time.sleep(1)
-
-                except Exception as e:
-                    logger.error(f"Error in run loop: {e}")
-                    time.sleep(10)
+            # Each task sleeps until its own work is due instead of polling a shared clock
+            await asyncio.gather(
+                self._tweet_loop(),
+                self._notification_loop(),
+                self._verification_watch()
+            )
 
         except Exception as e:
-            logger.error(f"Critical error in Twitter bot: {e}")
+            logger.error("Critical error in Twitter bot: %s", e)
         finally:
             self.stop()
             if not self.is_cleaning_up:
                 self.cleanup()
 
-    def generate_and_send_tweet(self):
-        """Generate and send a tweet"""
-        tweet_manager = self.service.get_tweet_manager()
-        if not all([self.generator, tweet_manager]):
+    async def _wait_or_stop(self, timeout: float) -> bool:
+        """Sleep for timeout seconds; return True if the bot was stopped meanwhile"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _await_service_ready(self) -> bool:
+        """Return once the service is usable, reinitializing it if the session was lost"""
+        if self.service.is_initialized():
+            return True
+        # One task recovers the service; the others wait here and reuse the result
+        async with self._reinit_lock:
+            if self.service.is_initialized():
+                return True
+            logger.error("Critical components lost during runtime")
+            if await asyncio.to_thread(self.initialize):  # Try to reinitialize
+                return True
+            logger.error("Could not recover components")
+            self._stop_event.set()
+            return False
+
+    async def _tweet_loop(self):
+        """Post a tweet whenever the current interval elapses"""
+        tweet_interval = self._schedule_rng.randint(60, 1200)  # 1-20 minutes
+        logger.info("Next tweet in %.1f minutes", tweet_interval / 60)
+        
+        while not await self._wait_or_stop(tweet_interval):
+            try:
+                if not await self._await_service_ready():
+                    break
+                logger.info("=== Generating Tweet ===")
+                await self.generate_and_send_tweet()
+            except Exception as e:
+                logger.error("Error generating tweet: %s", e)
+                self.service.note_driver_error(e)
+                # Back off by error type, but let stop() interrupt the wait
+                if await self._wait_or_stop(_backoff_for(e)):
+                    break
+            if not self._tweet_schedule:
+                self._refill_schedule()
+            tweet_interval = self._tweet_schedule.popleft()
+            logger.info("Next tweet in %.1f minutes", tweet_interval / 60)
+
+    def _refill_schedule(self):
+        """Precompute the next batch of tweet intervals"""
+        self._tweet_schedule.extend(
+            self._schedule_rng.randint(2600, 3600) for _ in range(TWEET_SCHEDULE_BATCH)
+        )
+
+    async def _notification_loop(self):
+        """Check mentions every NOTIFICATION_INTERVAL seconds"""
+        logger.info("Next notification check in %.1f minutes", NOTIFICATION_INTERVAL / 60)
+        
+        while not await self._wait_or_stop(NOTIFICATION_INTERVAL):
+            try:
+                if not await self._await_service_ready():
+                    break
+                logger.info("=== Checking Notifications ===")
+                tweet_manager = self._tweet_manager
+                if tweet_manager and self.generator:
+                    await asyncio.wrap_future(
+                        self.service.submit("check_and_process_mentions", self.generator)
+                    )
+            except Exception as e:
+                logger.error("Error checking notifications: %s", e)
+                self.service.note_driver_error(e)
+                # Back off by error type, but let stop() interrupt the wait
+                if await self._wait_or_stop(_backoff_for(e)):
+                    break
+            logger.info("Next notification check in %.1f minutes", NOTIFICATION_INTERVAL / 60)
+
+    async def _verification_watch(self):
+        """Look for a verification screen, probing less often while none shows up"""
+        while not await self._wait_or_stop(self._verify_backoff):
+            try:
+                if not await self._await_service_ready():
+                    break
+                # Both run through the service's browser executor so they never interleave with
+                # queued tweets or mention checks on the same page
+                if self.service.scraper and await asyncio.wrap_future(
+                    self.service.submit_scraper("is_verification_screen")
+                ):
+                    self._verify_backoff = VERIFY_BACKOFF_MIN
+                    logger.warning("Verification screen detected during operation")
+                    verification_success = await asyncio.wrap_future(
+                        self.service.submit_scraper("handle_verification_screen")
+                    )
+                    
+                    if verification_success:
+                        logger.info("Verification completed, continuing normal operation")
+                    else:
+                        logger.warning("Verification failed or timed out, will retry on next cycle")
+                else:
+                    self._verify_backoff = min(self._verify_backoff * 1.5, VERIFY_BACKOFF_MAX)
+            except Exception as e:
+                logger.error("Error checking for verification screen: %s", e)
+                self.service.note_driver_error(e)
+                # Back off by error type, but let stop() interrupt the wait
+                if await self._wait_or_stop(_backoff_for(e)):
+                    break
+
+    async def generate_and_send_tweet(self):
+        """Generate and send a tweet, keeping blocking calls off the event loop"""
+        tweet_manager = self._tweet_manager
+        if not (self.generator and tweet_manager):
             logger.error("Cannot generate and send tweet - missing components")
             return
 
         try:
             # Check for verification before attempting to tweet
-            if self.service.scraper and self.service.scraper.is_verification_screen():
+            if self.service.scraper and await asyncio.wrap_future(
+                self.service.submit_scraper("is_verification_screen")
+            ):
                 logger.warning("Verification screen detected before tweeting")
-                verification_success = self.service.scraper.handle_verification_screen()
+                verification_success = await asyncio.wrap_future(
+                    self.service.submit_scraper("handle_verification_screen")
+                )
                 
                 if not verification_success:
                     logger.warning("Tweet generation postponed due to verification issues")
                     return
             
-            # Check if OPENAI_API_KEY is configured
-            if not Config.OPENAI_API_KEY:
-                logger.warning("OpenAI API key not configured, using standard content generation")
-                use_crypto_news = False
-            else:
-                # Decide whether to use crypto news (70% chance)
-                use_crypto_news = random.random() < 0.7
-            
-            if use_crypto_news:
-                try:
-                    logger.info("Getting stored crypto news for tweet generation")
-                    # Get news from database instead of direct fetching
-                    news_data = self.generator.get_crypto_news_for_tweet()
-                    
-                    # Verify we got valid news content
-                    if news_data and news_data.get("content"):
-                        # Transform the news into Solexa's style
-                        content = self.generator.transform_crypto_news(news_data)
-                        
-                        # Log the original news and transformed content
-                        logger.info("Original news: %s", news_data.get("content", "")[:150])
-                        logger.info("Transformed content: %s", content)
-                    else:
-                        logger.warning("No valid news content retrieved, falling back to standard generation")
-                        content = self.generator.generate_content(
-                            conversation_context='',
-                            username=''
-                        )
-                        
-                except Exception as news_error:
-                    logger.error(f"Error with crypto news: {news_error}, falling back to standard generation")
-                    # Fall back to standard generation if news fetch/transform fails
-                    content = self.generator.generate_content(
-                        conversation_context='',
-                        username=''
-                    )
-            else:
-                # Generate standard content using AIGenerator
-                content = self.generator.generate_content(
-                    conversation_context='',
-                    username=''
-                )
+            # Decide whether to use crypto news (70% chance when the API key is configured)
+            use_crypto_news = self._news_enabled and random.random() < 0.7
+            content = await self._generate_news_or_standard(use_crypto_news)
 
             if not content or not isinstance(content, str):
                 logger.error("No valid content generated")
                 return
 
-            # Sanitize content before sending
+            # Sanitize content before sending (a single regex pass; cheaper than a thread hop)
             content = tweet_manager.sanitize_text(content)
 
             # Use the service to queue the tweet
-            self.service.send_tweet(content, priority=1, source="automated")
+            await asyncio.to_thread(self.service.send_tweet, content, priority=1, source="automated")
             logger.info("Tweet queued successfully")
 
         except Exception as e:
-            logger.error(f"Error generating/sending tweet: {e}")
+            logger.error("Error generating/sending tweet: %s", e)
+
+    async def _generate_news_or_standard(self, use_crypto_news: bool):
+        """Return tweet content from stored crypto news, or from standard generation"""
+        content = None
+        if use_crypto_news:
+            try:
+                logger.info("Getting stored crypto news for tweet generation")
+                # Get news from database instead of direct fetching
+                news_data = await asyncio.to_thread(self.generator.get_crypto_news_for_tweet)
+                
+                # Verify we got valid news content
+                if news_data and news_data.get("content"):
+                    # Transform the news into Solexa's style
+                    content = await asyncio.to_thread(self.generator.transform_crypto_news, news_data)
+                    
+                    # Log the original news and transformed content
+                    logger.info("Original news: %s", news_data.get("content", "")[:150])
+                    logger.info("Transformed content: %s", content)
+                else:
+                    logger.warning("No valid news content retrieved, falling back to standard generation")
+            except Exception as news_error:
+                logger.error("Error with crypto news: %s, falling back to standard generation", news_error)
+        
+        if content is None:
+            # Generate standard content using AIGenerator
+            content = await asyncio.to_thread(
+                self.generator.generate_content,
+                conversation_context='',
+                username=''
+            )
+        return content
 
     def stop(self):
         """Stop the bot gracefully"""
         logger.info("Stopping Twitter bot...")
         self.running = False
         self.is_cleaning_up = True
+        # Wake every loop immediately; stop() may be called from another thread
+        if self._stop_event is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop_event.set)
 
     def cleanup(self):
         """Cleanup resources"""
@@ -283,6 +392,7 @@ class TwitterBot:
         try:
             logger.info("Starting cleanup process...")
             self.running = False
+            self._tweet_manager = None
             
             # Service is now shared, so we don't close it here
             # Just indicate that the bot is no longer using it
@@ -291,7 +401,7 @@ class TwitterBot:
             logger.info("Cleanup completed successfully")
             
         except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
+            logger.error("Error during cleanup: %s", e)
 
     def get_tweet_manager(self):
         """Get the tweet manager, initializing if needed"""
@@ -1,17 +1,39 @@
+import asyncio
 import logging
 import time
 import threading
-import queue
+import itertools
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, Dict, Any
 from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import (
+    InvalidSessionIdException, NoSuchWindowException, WebDriverException
+)
 
-from .scraper import Scraper
+from .scraper import BrowserPool, Scraper
 from .tweets import TweetManager
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Handlers are configured once by the entry point, not on import
 logger = logging.getLogger('TwitterService')
 
+# Queued tweets held at most; further send_tweet calls are rejected until the queue drains
+TWEET_QUEUE_MAXSIZE = 1000
+
+# Queued tweets taken per consumer wake-up; capped so close() is never stuck behind a long backlog
+TWEET_BATCH_MAX = 10
+
+# WebDriver error texts that mean the browser session can't be used any more
+SESSION_LOST_ERRORS = ("invalid session id", "chrome not reachable", "disconnected", "no such window")
+
+@dataclass(slots=True)
+class TweetJob:
+    """A tweet waiting in TwitterService.tweet_queue"""
+    content: str
+    priority: int
+    source: str
+    timestamp: float
+
 class TwitterService:
     """
     Singleton service for managing Twitter interactions through a single browser instance.
@@ -20,12 +42,15 @@ class TwitterService:
     _lock = threading.Lock()
     
     def __new__(cls):
-        with cls._lock:
-            if cls._instance is None:
-                logger.info("Creating TwitterService singleton instance")
-                cls._instance = super(TwitterService, cls).__new__(cls)
-                cls._instance._initialized = False
-            return cls._instance
+        # Plain read on the fast path; the lock is only taken while the instance doesn't exist yet
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    logger.info("Creating TwitterService singleton instance")
+                    instance = super(TwitterService, cls).__new__(cls)
+                    instance._initialized = False
+                    cls._instance = instance
+        return cls._instance
     
     def __init__(self):
         if self._initialized:
@@ -36,18 +61,29 @@ class TwitterService:
         self.tweet_manager = None
         self.driver = None
         self.is_initializing = False
-        self.tweet_queue = queue.Queue()
-        self.processing_thread = None
+        # Lowest priority value first; bounded so a burst applies backpressure instead of growing forever.
+        # Only touched from _loop, which parks in epoll while the queue is idle
+        self.tweet_queue = asyncio.PriorityQueue(maxsize=TWEET_QUEUE_MAXSIZE)
+        self._queue_seq = itertools.count()  # tiebreaker so equal entries never compare the jobs
+        self._loop = None
+        self._loop_thread = None
+        self._consumer = None
         self.running = False
+        # Every browser operation holds this so page navigations never interleave
+        self._browser_lock = threading.RLock()
+        # Runs submit()ted operations one at a time, off the caller's thread
+        self._op_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="twitter-op")
+        # Set while the browser session is usable; cleared by close() or when the session is lost
+        self._ready_event = threading.Event()
         self._initialized = True
     
-    def initialize(self, proxy_url=None) -> bool:
-        """Initialize the Twitter service components"""
+    def initialize(self, proxy_url=None, env=None) -> bool:
+        """Initialize the Twitter service components; env overrides os.environ for the browser launch"""
         if self.is_initializing:
             logger.info("Initialization already in progress")
             return False
             
-        if self.scraper and self.tweet_manager:
+        if self._ready_event.is_set():
             logger.info("TwitterService already initialized")
             return True
             
@@ -55,15 +91,25 @@ class TwitterService:
             self.is_initializing = True
             logger.info("Initializing Twitter components")
             
+            # A lost session leaves its scraper behind; hand that browser back first
+            if self.scraper:
+                try:
+                    self.scraper.close()
+                except Exception as e:
+                    logger.error(f"Error closing lost scraper: {e}")
+            
             # Initialize scraper with browser
-            self.scraper = Scraper(proxy=proxy_url)
+            self.scraper = Scraper(proxy=proxy_url, env=env)
             initialization_success = self.scraper.initialize()
             
             # Check if verification screen is detected
             if not initialization_success and self.scraper and self.scraper.driver:
-                if self.scraper.is_verification_screen():
+                with self._browser_lock:
+                    verification_required = self.scraper.is_verification_screen()
+                if verification_required:
                     logger.warning("Verification required during initialization")
-                    verification_success = self.scraper.handle_verification_screen()
+                    with self._browser_lock:
+                        verification_success = self.scraper.handle_verification_screen()
                     
                     if verification_success:
                         # Complete login after verification
@@ -86,11 +132,11 @@ class TwitterService:
             # Initialize tweet manager
             self.tweet_manager = TweetManager(self.driver)
             
-            # Start the tweet processing thread
+            # Start the tweet queue consumer
             self.running = True
-            self.processing_thread = threading.Thread(target=self._process_tweet_queue, daemon=True)
-            self.processing_thread.start()
+            self._start_consumer()
             
+            self._ready_event.set()
             logger.info("TwitterService initialized successfully")
             self.is_initializing = False
             return True
@@ -100,6 +146,15 @@ class TwitterService:
             self.is_initializing = False
             return False
     
+    def acquire_driver(self, proxy_url=None, env=None) -> bool:
+        """
+        Re-initialize the service on a warm browser from the scraper's BrowserPool.
+        The current browser is handed back first; the pool discards it if it no longer responds.
+        """
+        if self.scraper:
+            self.close(keep_browser=True)
+        return self.initialize(proxy_url=proxy_url, env=env)
+    
     def get_driver(self) -> Optional[WebDriver]:
         """Get the WebDriver instance"""
         return self.driver
@@ -129,21 +184,21 @@ class TwitterService:
                     return False
             
             # Add to queue
-            tweet_data = {
-                "content": content,
-                "priority": priority,
-                "source": source,
-                "timestamp": time.time()
-            }
-            
-            self.tweet_queue.put(tweet_data)
+            job = TweetJob(content, priority, source, time.time())
+            
+            try:
+                self._enqueue((priority, job.timestamp, next(self._queue_seq), job))
+            except asyncio.QueueFull:
+                logger.error(f"Tweet queue full ({TWEET_QUEUE_MAXSIZE}), dropping tweet from {source}")
+                return False
             logger.info(f"Tweet from {source} queued (queue size: {self.tweet_queue.qsize()})")
             
             # If it's a high priority tweet (from web UI), process immediately
             if priority == 0 and self.tweet_manager:
                 # Direct processing for immediate feedback
                 try:
-                    self.tweet_manager.send_tweet(content)
+                    with self._browser_lock:
+                        self.tweet_manager.send_tweet(content)
                     logger.info(f"High priority tweet from {source} sent immediately")
                     return True
                 except Exception as e:
@@ -156,59 +211,147 @@ class TwitterService:
             logger.error(f"Error queuing tweet: {e}")
             return False
     
-    def _process_tweet_queue(self):
-        """Background thread to process queued tweets"""
+    def submit(self, operation: str, *args, **kwargs) -> Future:
+        """
+        Queue a TweetManager operation (e.g. "check_and_process_mentions") to run under the
+        browser lock, so it never navigates away from a page another operation is using.
+        
+        Returns:
+            Future: resolves to the operation's return value; await with asyncio.wrap_future
+        """
+        return self._op_executor.submit(self._run_operation, "tweet_manager", operation, args, kwargs)
+    
+    def submit_scraper(self, operation: str, *args, **kwargs) -> Future:
+        """
+        Queue a Scraper operation (e.g. "handle_verification_screen") on the same serialized
+        executor and browser lock as submit(). Verification code entry from the web interface
+        goes through VerificationManager without this lock, so a pending
+        handle_verification_screen can still be completed.
+        """
+        return self._op_executor.submit(self._run_operation, "scraper", operation, args, kwargs)
+    
+    def _run_operation(self, component: str, operation: str, args, kwargs):
+        target = getattr(self, component)
+        if not target:
+            raise RuntimeError("TwitterService not initialized")
+        with self._browser_lock:
+            return getattr(target, operation)(*args, **kwargs)
+    
+    def _start_consumer(self):
+        """Start the queue's event loop thread once, and the consumer task if it isn't running"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever, name="tweet-queue", daemon=True
+            )
+            self._loop_thread.start()
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.run_coroutine_threadsafe(self._process_tweet_queue(), self._loop)
+    
+    def _enqueue(self, item, timeout: float = 5.0):
+        """Put an item on tweet_queue from any thread; raises asyncio.QueueFull when it is full"""
+        async def put():
+            self.tweet_queue.put_nowait(item)
+        if self._loop is None:
+            # No consumer yet; nothing is waiting on the queue, so a direct put is safe
+            self.tweet_queue.put_nowait(item)
+            return
+        asyncio.run_coroutine_threadsafe(put(), self._loop).result(timeout)
+    
+    async def _process_tweet_queue(self):
+        """Consumer task on the tweet-queue loop; sends run through submit() off the loop"""
+        # Started by initialize() after the tweet manager exists; close() stops this task before clearing it
+        tweet_manager = self.tweet_manager
+        if not tweet_manager:
+            logger.error("Tweet queue processor started without a tweet manager")
+            return
         logger.info("Tweet queue processor started")
         
         while self.running:
-            try:
-                # Process any tweets in the queue
-                if not self.tweet_queue.empty() and self.tweet_manager:
-                    tweet_data = self.tweet_queue.get(timeout=1)
-                    
-                    try:
-                        logger.info(f"Processing queued tweet from {tweet_data['source']}")
-                        self.tweet_manager.send_tweet(tweet_data["content"])
-                        logger.info(f"Successfully sent queued tweet from {tweet_data['source']}")
-                    except Exception as e:
-                        logger.error(f"Error processing queued tweet: {e}")
-                    finally:
-                        self.tweet_queue.task_done()
-                else:
-                    # No tweets to process, sleep
-                    time.sleep(5)
-                    
-            except queue.Empty:
-                # No tweets in queue, continue
-                pass
-            except Exception as e:
-                logger.error(f"Error in tweet queue processor: {e}")
-                time.sleep(10)  # Sleep on error to avoid tight loop
+            # Park until something arrives, then take whatever else is already waiting
+            batch = [await self.tweet_queue.get()]
+            while len(batch) < TWEET_BATCH_MAX:
+                try:
+                    batch.append(self.tweet_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            
+            # None is the wake-up sentinel pushed by close()
+            items = [item for item in batch if item[3] is not None]
+            
+            # Send back to back on the browser; content is posted as queued, callers sanitize it
+            for index, item in enumerate(items):
+                job = item[3]
+                if not self.running:
+                    # Shutting down: put the unsent tweets back for the next consumer
+                    for unsent in items[index:]:
+                        try:
+                            self.tweet_queue.put_nowait(unsent)
+                        except asyncio.QueueFull:
+                            logger.error(f"Tweet queue full, dropping queued tweet from {unsent[3].source}")
+                    break
+                try:
+                    logger.info(f"Processing queued tweet from {job.source}")
+                    await asyncio.wrap_future(self.submit("send_tweet", job.content))
+                    logger.info(f"Successfully sent queued tweet from {job.source}")
+                except Exception as e:
+                    logger.error(f"Error processing queued tweet: {e}")
+                    self.note_driver_error(e)
+            
+            for _ in batch:
+                self.tweet_queue.task_done()
     
     def is_initialized(self) -> bool:
         """Check if the service is initialized"""
-        return self.scraper is not None and self.tweet_manager is not None
+        return self._ready_event.is_set()
     
-    def close(self):
-        """Close the service and clean up resources"""
+    def note_driver_error(self, error: Exception) -> bool:
+        """Mark the service as not ready if error means the browser session is gone"""
+        lost = isinstance(error, (InvalidSessionIdException, NoSuchWindowException)) or (
+            isinstance(error, WebDriverException)
+            and any(marker in str(error).lower() for marker in SESSION_LOST_ERRORS)
+        )
+        if lost and self._ready_event.is_set():
+            logger.warning(f"Browser session lost: {error}")
+            self._ready_event.clear()
+        return lost
+    
+    def close(self, keep_browser: bool = False):
+        """
+        Close the service and clean up resources. Browsers are quit, including warm ones idle
+        in the BrowserPool, unless keep_browser hands the current one back for reuse.
+        """
         self.running = False
+        self._ready_event.clear()
         
-        if self.processing_thread and self.processing_thread.is_alive():
+        if self._consumer and not self._consumer.done():
+            # Wake the processor so it sees running is False; if the queue is full it is busy anyway
+            try:
+                self._enqueue((-1, 0.0, next(self._queue_seq), None))
+            except asyncio.QueueFull:
+                pass
             logger.info("Waiting for tweet processor to finish")
-            self.processing_thread.join(timeout=30)
+            try:
+                self._consumer.result(timeout=30)
+            except Exception as e:
+                logger.error(f"Tweet processor did not stop cleanly: {e}")
         
         if self.scraper:
             logger.info("Closing scraper")
             try:
-                self.scraper.close()
+                self.scraper.close(keep_browser=keep_browser)
             except Exception as e:
                 logger.error(f"Error closing scraper: {e}")
             finally:
                 self.scraper = None
                 self.driver = None
                 self.tweet_manager = None
+        
+        if not keep_browser:
+            BrowserPool.shutdown()
                 
         logger.info("TwitterService closed")
 
-# Create singleton instance
-twitter_service = TwitterService() 
\ No newline at end of file
+def get_twitter_service() -> TwitterService:
+    """Return the TwitterService singleton, creating it on first use"""
+    return TwitterService() 
\ No newline at end of file
@@ -1,5 +1,8 @@
+import atexit
 import logging
+import logging.handlers
 import json
+import queue
 from functools import wraps
 import time
 import os
@@ -7,23 +10,39 @@ import os
 class APILogger:
     """Utility for logging API requests and responses in detail"""
     
+    # Listener per log file, so repeated instances don't stack duplicate handlers
+    _listeners = {}
+    
     def __init__(self, log_dir='logs'):
         self.log_dir = log_dir
+        self.logger = logging.getLogger('api_logger')
+        
+        log_path = os.path.abspath(os.path.join(log_dir, 'api_requests.log'))
+        if log_path in APILogger._listeners:
+            self.listener = APILogger._listeners[log_path]
+            return
         
         # Create logs directory if it doesn't exist
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
             
         # Configure logger
-        self.logger = logging.getLogger('api_logger')
         self.logger.setLevel(logging.DEBUG)
         
         # File handler
-        file_handler = logging.FileHandler(f'{log_dir}/api_requests.log')
+        file_handler = logging.FileHandler(log_path)
         file_handler.setLevel(logging.DEBUG)
         formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s')
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        
+        # Callers only enqueue records; a background listener does the file I/O
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        self.listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+        self.listener.start()
+        APILogger._listeners[log_path] = self.listener
+        # Drain queued records to the file before the interpreter exits
+        atexit.register(self.listener.stop)
     
     def log_api_call(self, func):
         """Decorator to log API calls"""
@@ -33,16 +52,17 @@ class APILogger:
             
             # Extract method name and arguments
             method_name = func.__name__
-            self.logger.info(f"Calling {method_name}")
+            self.logger.info("Calling %s", method_name)
             
-            # Log arguments if they're not too large
-            try:
-                arg_str = json.dumps(kwargs, indent=2, default=str)
-                if len(arg_str) > 1000:
-                    arg_str = arg_str[:1000] + "... [truncated]"
-                self.logger.debug(f"Arguments: {arg_str}")
-            except:
-                self.logger.debug("Could not serialize arguments")
+            # Log arguments if they're not too large; skip serializing when DEBUG is filtered out
+            if self.logger.isEnabledFor(logging.DEBUG):
+                try:
+                    arg_str = json.dumps(kwargs, indent=2, default=str)
+                    if len(arg_str) > 1000:
+                        arg_str = arg_str[:1000] + "... [truncated]"
+                    self.logger.debug("Arguments: %s", arg_str)
+                except:
+                    self.logger.debug("Could not serialize arguments")
             
             try:
                 # Call the original function
@@ -50,35 +70,45 @@ class APILogger:
                 
                 # Log completion time
                 elapsed_time = time.time() - start_time
-                self.logger.info(f"{method_name} completed in {elapsed_time:.2f} seconds")
+                self.logger.info("%s completed in %.2f seconds", method_name, elapsed_time)
                 
                 # Log the result structure
-                try:
-                    if isinstance(result, dict):
-                        # Create a shallow copy to avoid modifying the original
-                        result_to_log = result.copy()
-                        
-                        # Handle large content fields
-                        for key, value in result.items():
-                            if isinstance(value, str) and len(value) > 500:
-                                result_to_log[key] = f"{value[:500]}... [truncated, total length: {len(value)}]"
-                        
-                        result_str = json.dumps(result_to_log, indent=2, default=str)
-                        self.logger.debug(f"Result structure: {result_str}")
-                    else:
-                        self.logger.debug(f"Result type: {type(result).__name__}")
-                except:
-                    self.logger.debug("Could not serialize result")
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    try:
+                        if isinstance(result, dict):
+                            # Truncate large content fields without modifying the original
+                            result_to_log = {
+                                key: f"{value[:500]}... [truncated, total length: {len(value)}]"
+                                if isinstance(value, str) and len(value) > 500 else value
+                                for key, value in result.items()
+                            }
+                            
+                            result_str = json.dumps(result_to_log, indent=2, default=str)
+                            self.logger.debug("Result structure: %s", result_str)
+                        else:
+                            self.logger.debug("Result type: %s", type(result).__name__)
+                    except:
+                        self.logger.debug("Could not serialize result")
                 
                 return result
                 
             except Exception as e:
                 # Log any exceptions
-                self.logger.error(f"Error in {method_name}: {str(e)}", exc_info=True)
+                self.logger.error("Error in %s: %s", method_name, e, exc_info=True)
                 raise
         
+        wrapper._is_patched = True
         return wrapper
 
+_default_api_logger = None
+
+def get_api_logger():
+    """Return the shared APILogger writing to the default log directory"""
+    global _default_api_logger
+    if _default_api_logger is None:
+        _default_api_logger = APILogger()
+    return _default_api_logger
+
 # Example of how to use this with AIGenerator
 def patch_ai_generator():
     """
@@ -94,8 +124,11 @@ def patch_ai_generator():
     """
     from src.ai_generator import AIGenerator
     
-    # Create logger instance
-    api_logger = APILogger()
+    # Already wrapped; patching again would log every call twice
+    if getattr(AIGenerator.fetch_crypto_news, '_is_patched', False):
+        return
+    
+    api_logger = get_api_logger()
     
     # Patch methods
     original_fetch = AIGenerator.fetch_crypto_news
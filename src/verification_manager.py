@@ -2,37 +2,105 @@ import logging
 import time
 import json
 from datetime import datetime, timedelta
+import atexit
+import threading
+from collections import OrderedDict
 from threading import Lock
 from pathlib import Path
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Handlers are configured once by the entry point, not on import
 logger = logging.getLogger('VerificationManager')
 
+# Verification state file shared with the web interface; resolved once at import
+if os.getenv('VERIFICATION_FILE_PATH'):
+    _STORAGE_PATH = Path(os.environ['VERIFICATION_FILE_PATH'])
+elif os.environ.get("DOCKER_ENV") == "true":
+    _STORAGE_PATH = Path("/app/static/verifications.json")
+else:
+    _STORAGE_PATH = Path(__file__).resolve().parents[1] / "static" / "verifications.json"
+try:
+    _STORAGE_PATH.parent.mkdir(parents=True, exist_ok=True)
+except OSError as e:
+    logger.warning(f"Could not create verification directory {_STORAGE_PATH.parent}: {e}")
+
+# Append-only log of changes made since the snapshot in _STORAGE_PATH was written
+_JOURNAL_PATH = _STORAGE_PATH.with_suffix('.jsonl')
+# Rewrite the snapshot once the journal holds this many times more lines than there are live records
+JOURNAL_COMPACT_RATIO = 10
+JOURNAL_COMPACT_MIN = 100
+# Seconds a non-empty journal may go without being folded into the snapshot the dashboard serves
+JOURNAL_COMPACT_INTERVAL = 30
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """Encode verification state or a journal event on a single line"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+def _loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 class VerificationManager:
     """Manages verification sessions across services within the same process"""
     
-    # Storage for active verification sessions
-    _verifications: Dict[str, Dict[str, Any]] = {}
+    # Storage for active verification sessions, oldest first so expiry only touches the head
+    _verifications: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    # IDs still awaiting a code, so pending lookups don't scan every record
+    _pending_ids: Set[str] = set()
+    # JSON-ready mirror of _verifications (no drivers, ISO timestamps); entries are replaced, never
+    # mutated, so a shallow copy taken under _lock is a consistent snapshot to write
+    _serialized: Dict[str, Dict[str, Any]] = {}
     _lock = Lock()
+    # Fixed set of striped per-ID locks, so slow browser work on one ID doesn't block the others
+    _id_locks = [Lock() for _ in range(16)]
+    # One driver-less Scraper per thread, reused by submit_verification_code with the session's driver
+    _submit_scrapers = threading.local()
+    
+    # Mutations only mark the state dirty; a background thread writes it at most every _flush_interval
+    _dirty = False
+    _flush_interval = 0.5
+    _flusher: Optional[threading.Thread] = None
+    # Set by _mark_dirty so the idle flusher sleeps until there is something to write
+    _flush_wakeup = threading.Event()
+    
+    # Journal events not yet written by the flusher; guarded by _lock
+    _pending_events: List[Dict[str, Any]] = []
+    # Serializes the disk writers (flusher, atexit flush, explicit saves)
+    _io_lock = Lock()
+    _journal_fh = None
+    _journal_lines = 0
+    _force_snapshot = False
+    _last_snapshot = time.monotonic()
+    
+    # st_mtime_ns of the snapshot and journal as of the last load/write; reloads are skipped while unchanged
+    _last_loaded_mtime: Tuple[int, int] = (0, 0)
     
     @classmethod
     def register_verification(cls, verification_id: str, screenshot_path: str, driver=None) -> bool:
         """Register a new verification session"""
         with cls._lock:
-            cls._verifications[verification_id] = {
+            # Re-registering moves the session to the tail to keep timestamp order
+            cls._verifications.pop(verification_id, None)
+            cls._store(verification_id, {
                 'id': verification_id,
                 'screenshot_path': screenshot_path,
                 'timestamp': datetime.now(),  # Use datetime object directly
                 'status': 'pending',  # Add explicit 'pending' status
                 'driver': driver,
                 'code': None
-            }
+            })
+            
+            cls._pending_ids.add(verification_id)
             
             # Also save to disk for persistence
-            cls._save_verifications()
+            cls._mark_dirty()
             
             logger.info(f"Registered new verification session: {verification_id}")
             return True
@@ -42,8 +110,9 @@ class VerificationManager:
         """Mark a verification as completed"""
         with cls._lock:
             if verification_id in cls._verifications:
-                cls._verifications[verification_id]['completed'] = True
-                cls._save_verifications()
+                cls._update(verification_id, completed=True)
+                cls._pending_ids.discard(verification_id)
+                cls._mark_dirty()
                 return True
             return False
     
@@ -52,8 +121,9 @@ class VerificationManager:
         """Cancel a verification session"""
         with cls._lock:
             if verification_id in cls._verifications:
-                cls._verifications.pop(verification_id)
-                cls._save_verifications()
+                cls._drop(verification_id)
+                cls._pending_ids.discard(verification_id)
+                cls._mark_dirty()
                 return True
             return False
     
@@ -90,21 +160,23 @@ class VerificationManager:
     @classmethod
     def submit_verification_code(cls, verification_id: str, code: str) -> bool:
         """Submit a verification code for a session with better error handling"""
-        with cls._lock:
+        # Only this ID's stripe is held across the browser round trip; _lock guards the dict itself
+        with cls._id_lock(verification_id):
             try:
-                if verification_id not in cls._verifications:
-                    logger.error(f"Verification ID not found: {verification_id}")
-                    return False
-                
-                verification = cls._verifications[verification_id]
-                driver = verification.get('driver')
+                with cls._lock:
+                    verification = cls._verifications.get(verification_id)
+                    if verification is None:
+                        logger.error(f"Verification ID not found: {verification_id}")
+                        return False
+                    driver = verification.get('driver')
                 
                 if not driver:
                     logger.error(f"No driver associated with verification: {verification_id}")
                     
                     # Try to get current driver from TwitterService as fallback
                     try:
-                        from src.twitter_bot.twitter_service import twitter_service
+                        from src.twitter_bot.twitter_service import get_twitter_service
+                        twitter_service = get_twitter_service()
                         if twitter_service and twitter_service.scraper and twitter_service.scraper.driver:
                             logger.info("Using active Twitter service driver as fallback")
                             driver = twitter_service.scraper.driver
@@ -114,19 +186,27 @@ class VerificationManager:
                         logger.error(f"Error getting fallback driver: {import_error}")
                         return False
                     
-                # Import here to avoid circular imports
-                from src.twitter_bot.scraper import Scraper
-                scraper_instance = Scraper()
+                scraper_instance = cls._submit_scraper()
                 scraper_instance.driver = driver
                 
                 # Try to submit the code
-                success = scraper_instance.submit_verification_code(code)
+                try:
+                    success = scraper_instance.submit_verification_code(code)
+                finally:
+                    # Don't keep the session's browser alive through the shim
+                    scraper_instance.driver = None
                 
                 if success:
-                    verification['completed'] = True
-                    verification['status'] = 'completed' # Add both flags for consistency
-                    verification['code'] = code
-                    cls._save_verifications()
+                    with cls._lock:
+                        # Cleanup, cancel or a reload may have dropped the record during the submit;
+                        # the code was still accepted, so only the bookkeeping is skipped
+                        if verification_id in cls._verifications:
+                            # Set both flags for consistency
+                            cls._update(verification_id, completed=True, status='completed', code=code)
+                            cls._pending_ids.discard(verification_id)
+                            cls._mark_dirty()
+                        else:
+                            logger.warning(f"Verification {verification_id} was removed while its code was submitted")
                     logger.info(f"Verification completed for ID: {verification_id}")
                     return True
                 else:
@@ -136,51 +216,188 @@ class VerificationManager:
                 logger.error(f"Error submitting verification code: {e}")
                 return False
     
+    @classmethod
+    def _submit_scraper(cls):
+        """This thread's Scraper shim; thread-local so concurrent submits never swap each other's driver"""
+        scraper_instance = getattr(cls._submit_scrapers, 'scraper', None)
+        if scraper_instance is None:
+            # Import here to avoid circular imports
+            from src.twitter_bot.scraper import Scraper
+            scraper_instance = cls._submit_scrapers.scraper = Scraper()
+        return scraper_instance
+    
+    @classmethod
+    def _id_lock(cls, verification_id: str) -> Lock:
+        """Striped lock serializing operations on one verification ID"""
+        return cls._id_locks[hash(verification_id) % len(cls._id_locks)]
+    
+    @classmethod
+    def _mark_dirty(cls) -> None:
+        """Schedule a write of the current state; call with _lock held"""
+        cls._dirty = True
+        cls._flush_wakeup.set()
+        if cls._flusher is None or not cls._flusher.is_alive():
+            cls._flusher = threading.Thread(target=cls._flush_loop, name="verification-flusher", daemon=True)
+            cls._flusher.start()
+    
+    @classmethod
+    def _flush_loop(cls) -> None:
+        """Background writer that collapses bursts of mutations into one file write"""
+        while True:
+            # Only a journal awaiting compaction needs a timed wake-up; otherwise wait for a mutation
+            timeout = None
+            if cls._journal_lines:
+                timeout = max(0.0, cls._last_snapshot + JOURNAL_COMPACT_INTERVAL - time.monotonic()) + cls._flush_interval
+            cls._flush_wakeup.wait(timeout)
+            cls._flush_wakeup.clear()
+            # Let a burst of mutations accumulate before writing
+            time.sleep(cls._flush_interval)
+            cls.flush()
+    
+    @classmethod
+    def flush(cls) -> None:
+        """Write pending changes to disk now"""
+        with cls._io_lock:
+            with cls._lock:
+                stale = cls._journal_lines and time.monotonic() - cls._last_snapshot > JOURNAL_COMPACT_INTERVAL
+                if not cls._dirty and not stale:
+                    return
+                events, cls._pending_events = cls._pending_events, []
+                snapshot = None
+                compact_at = max(JOURNAL_COMPACT_MIN, JOURNAL_COMPACT_RATIO * len(cls._serialized))
+                if stale or cls._force_snapshot or cls._journal_lines + len(events) > compact_at:
+                    snapshot = dict(cls._serialized)
+                cls._dirty = False
+            # Write outside _lock so readers and mutators aren't blocked on disk I/O
+            if snapshot is not None:
+                cls._write_verifications(snapshot)
+            else:
+                cls._append_journal(events)
+    
+    @classmethod
+    def _store(cls, verification_id: str, verification: Dict[str, Any], journal: bool = True) -> None:
+        """Insert a record and its serialized form; call with _lock held"""
+        cls._verifications[verification_id] = verification
+        record = cls._serialized[verification_id] = {
+            k: v.isoformat() if isinstance(v, datetime) else v
+            for k, v in verification.items() if k != 'driver'  # Driver objects aren't serializable
+        }
+        if journal:
+            cls._pending_events.append({'op': 'set', 'id': verification_id, 'rec': record})
+    
+    @classmethod
+    def _update(cls, verification_id: str, **fields) -> None:
+        """Change fields of an existing record and its serialized form; call with _lock held"""
+        cls._verifications[verification_id].update(fields)
+        record = cls._serialized[verification_id] = {**cls._serialized[verification_id], **fields}
+        cls._pending_events.append({'op': 'set', 'id': verification_id, 'rec': record})
+    
+    @classmethod
+    def _drop(cls, verification_id: str) -> None:
+        """Remove a record and its serialized form; call with _lock held"""
+        cls._verifications.pop(verification_id, None)
+        cls._serialized.pop(verification_id, None)
+        cls._pending_events.append({'op': 'del', 'id': verification_id})
+    
     @classmethod
     def _save_verifications(cls) -> None:
-        """Save verifications to disk for persistence"""
+        """Write a full snapshot now and start a fresh journal"""
+        with cls._io_lock:
+            with cls._lock:
+                snapshot = dict(cls._serialized)
+                cls._pending_events = []
+                cls._dirty = False
+            cls._write_verifications(snapshot)
+    
+    @classmethod
+    def _append_journal(cls, events: List[Dict[str, Any]]) -> None:
+        """Append events to the journal, one JSON object per line; call with _io_lock held"""
         try:
-            # Get verification file path from environment or use default
-            verification_file_path = os.getenv('VERIFICATION_FILE_PATH', '/app/static/verifications.json')
+            if cls._journal_fh is None:
+                cls._journal_fh = open(_JOURNAL_PATH, 'ab')
+            cls._journal_fh.write(b''.join(_dumps(event) + b'\n' for event in events))
+            cls._journal_fh.flush()
+            cls._journal_lines += len(events)
+            cls._last_loaded_mtime = cls._state_mtime()
+        except Exception as e:
+            logger.error(f"Error appending to verification journal: {e}")
+            # The dropped events are only recoverable from memory; rewrite the whole snapshot next time
+            with cls._lock:
+                cls._force_snapshot = True
+                cls._mark_dirty()
+    
+    @staticmethod
+    def _state_mtime() -> Tuple[int, int]:
+        """st_mtime_ns of the snapshot and the journal, 0 for a missing file"""
+        mtimes = []
+        for path in (_STORAGE_PATH, _JOURNAL_PATH):
+            try:
+                mtimes.append(path.stat().st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(0)
+        return tuple(mtimes)
+    
+    @staticmethod
+    def _replay_journal(data: Dict[str, Any]) -> int:
+        """Apply journal events on top of snapshot data; returns the number of lines read"""
+        try:
+            with open(_JOURNAL_PATH, 'rb') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return 0
+        for line in lines:
+            try:
+                event = _loads(line)
+            except ValueError:
+                # A torn final line from an interrupted append
+                continue
+            if event.get('op') == 'set':
+                data[event['id']] = event['rec']
+            elif event.get('op') == 'del':
+                data.pop(event['id'], None)
+        return len(lines)
+    
+    @classmethod
+    def _write_verifications(cls, serializable_verifications: Dict[str, Dict[str, Any]]) -> bool:
+        """Atomically replace the snapshot with the given state and empty the journal; call with _io_lock held"""
+        try:
+            path = _STORAGE_PATH
             
-            # Create directory if it doesn't exist
-            path = Path(verification_file_path)
-            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a sibling temp file and swap it in, so readers never see a partial file
+            tmp_path = path.with_name(path.name + '.tmp')
+            tmp_path.write_bytes(_dumps(serializable_verifications))
+            os.replace(tmp_path, path)
             
-            # Create a serializable copy without driver objects and with ISO formatted datetimes
-            serializable_verifications = {}
-            for id, verification in cls._verifications.items():
-                serializable_verification = {}
-                for k, v in verification.items():
-                    if k == 'driver':
-                        # Skip driver objects - not serializable
-                        continue
-                    elif k == 'timestamp' and isinstance(v, datetime):
-                        # Convert datetime to ISO format string
-                        serializable_verification[k] = v.isoformat()
-                    else:
-                        serializable_verification[k] = v
-                serializable_verifications[id] = serializable_verification
+            # Everything in the journal is now in the snapshot; replaying it again would be harmless
+            if cls._journal_fh is None:
+                cls._journal_fh = open(_JOURNAL_PATH, 'ab')
+            cls._journal_fh.truncate(0)
+            cls._journal_lines = 0
+            cls._force_snapshot = False
+            cls._last_snapshot = time.monotonic()
             
-            # Write to file
-            with open(verification_file_path, 'w') as f:
-                json.dump(serializable_verifications, f, indent=2)
+            # Our own write must not look like an external change and trigger a reload
+            cls._last_loaded_mtime = cls._state_mtime()
             
             logger.info(f"Saved {len(serializable_verifications)} verifications to disk")
+            return True
             
         except Exception as e:
             logger.error(f"Error saving verifications: {e}")
+            return False
     
     @classmethod
     def load_verifications(cls) -> None:
         """Load verifications from disk on startup"""
         try:
-            verification_file_path = os.getenv('VERIFICATION_FILE_PATH', '/app/static/verifications.json')
-            path = Path(verification_file_path)
+            path = _STORAGE_PATH
             
-            if path.exists():
-                with open(verification_file_path, 'r') as f:
-                    loaded_verifications = json.load(f)
+            if path.exists() or _JOURNAL_PATH.exists():
+                loaded_verifications = {}
+                if path.exists():
+                    with open(path, 'rb') as f:
+                        loaded_verifications = _loads(f.read())
+                cls._replay_journal(loaded_verifications)
                     
                 # Only load verifications that aren't completed
                 with cls._lock:
@@ -188,7 +405,16 @@ class VerificationManager:
                         if not verification.get('completed', True):
                             # Add to in-memory storage without driver (will be reconnected later if needed)
                             verification['driver'] = None
-                            cls._verifications[id] = verification
+                            try:
+                                verification['timestamp'] = datetime.fromisoformat(verification.get('timestamp'))
+                            except (TypeError, ValueError):
+                                verification['timestamp'] = datetime.now()
+                            cls._store(id, verification, journal=False)
+                            cls._pending_ids.add(id)
+                    # Restore oldest-first order for expiry
+                    cls._verifications = OrderedDict(
+                        sorted(cls._verifications.items(), key=lambda item: item[1]['timestamp'])
+                    )
                             
                 logger.info(f"Loaded {len(cls._verifications)} active verifications from disk")
         except FileNotFoundError:
@@ -198,19 +424,34 @@ class VerificationManager:
         
     @classmethod
     def _load_verifications(cls):
-        """Load verifications from file with age filtering and error recovery"""
+        """
+        Load verifications from file with age filtering and error recovery.
+        Reading and parsing happen without _lock (writes are atomic replaces and appends); only
+        the final swap of the in-memory state takes it, so callers must not hold _lock.
+        """
         try:
-            file_path = os.getenv("VERIFICATION_FILE_PATH", os.path.join(os.path.dirname(__file__), "verifications.json"))
+            # In-memory state has changes the flusher hasn't written yet; it is newer than the file
+            if cls._dirty:
+                return True
             
-            # Skip if file doesn't exist
-            if not os.path.exists(file_path):
+            file_path = _STORAGE_PATH
+            
+            # Skip if neither the snapshot nor the journal exists
+            mtime = cls._state_mtime()
+            if mtime == (0, 0):
                 return False
             
-            # Try to load the file
+            # Nothing changed on disk since the last load or our own write
+            if mtime == cls._last_loaded_mtime:
+                return True
+            
+            # Try to load the snapshot, then apply the changes journaled since
             try:
-                with open(file_path, 'r') as f:
-                    loaded_data = json.load(f)
-            except json.JSONDecodeError as e:
+                loaded_data = {}
+                if mtime[0]:
+                    with open(file_path, 'rb') as f:
+                        loaded_data = _loads(f.read())
+            except ValueError as e:
                 logger.error(f"JSON decode error in verification file: {e}")
                 # Create backup of corrupted file
                 backup_path = f"{file_path}.corrupted"
@@ -226,13 +467,13 @@ class VerificationManager:
                     logger.error(f"Failed to create backup: {backup_error}")
                 return False
                 
-            # Reset verifications dictionary to avoid duplicates
-            cls._verifications = {}
+            journal_lines = cls._replay_journal(loaded_data)
             
             # Get cutoff time (1 hour ago)
             cutoff_time = datetime.now().timestamp() - (60 * 60)  # 1 hour in seconds
             
             # Process each verification with proper timestamp handling
+            loaded = []
             for verification_id, data in loaded_data.items():
                 # Parse timestamp properly
                 timestamp = data.get("timestamp")
@@ -267,15 +508,32 @@ class VerificationManager:
                     continue
                 
                 # Add valid verification to memory
-                cls._verifications[verification_id] = {
+                loaded.append({
                     "id": verification_id,
                     "timestamp": timestamp_obj,
                     "screenshot_path": data.get("screenshot_path", ""),
                     "status": "pending",  # Force status to pending for consistency
                     "driver": None,  # Driver object can't be stored in JSON
                     "completed": False  # Explicitly set to False
-                }
+                })
             
+            with cls._lock:
+                # A mutation landed while we were reading; memory is newer than what we parsed
+                if cls._dirty:
+                    return True
+                
+                # Reset verifications dictionary to avoid duplicates
+                cls._verifications = OrderedDict()
+                cls._pending_ids = set()
+                cls._serialized = {}
+                
+                # Insert oldest first so cleanup can expire from the head
+                for verification in sorted(loaded, key=lambda v: v["timestamp"]):
+                    cls._store(verification["id"], verification, journal=False)
+                    cls._pending_ids.add(verification["id"])
+                
+                cls._journal_lines = journal_lines
+                cls._last_loaded_mtime = mtime
             logger.info(f"Loaded {len(cls._verifications)} active verifications from disk")
             return True
         except Exception as e:
@@ -285,19 +543,19 @@ class VerificationManager:
     @classmethod
     def list_pending_verifications(cls):
         """List all pending verification requests with age filtering"""
+        # Load verifications first; the parse runs outside the lock
+        cls._load_verifications()
+        
         with cls._lock:
-            # Load verifications first
-            cls._load_verifications()
-            
             # Get cutoff time (verifications older than 1 hour are ignored)
             cutoff_time = datetime.now() - timedelta(hours=1)
             
             pending = {}
+            # Walk the ordered records so the list keeps registration order
             for vid, v in cls._verifications.items():
-                # Skip if verification is completed
-                if v.get('completed', False) or v.get('status') == 'completed':
+                if vid not in cls._pending_ids:
                     continue
-                    
+                
                 # Get timestamp
                 timestamp = v.get('timestamp')
                 
@@ -323,46 +581,39 @@ class VerificationManager:
             current_time = datetime.now()
             cutoff_time = current_time - timedelta(hours=max_age_hours)
             
+            # Records are kept oldest first, so stop at the first one that is still live
             to_remove = []
-            for vid, verification in cls._verifications.items():
-                # Get timestamp
-                timestamp = verification.get('timestamp')
-                
-                # Handle string timestamps
-                if isinstance(timestamp, str):
-                    try:
-                        timestamp = datetime.fromisoformat(timestamp)
-                    except ValueError:
-                        # Skip if we can't parse the timestamp
-                        continue
-                        
-                # Skip if timestamp is None
-                if timestamp is None:
-                    continue
-                    
-                # Check if verification is too old
-                if timestamp < cutoff_time:
-                    to_remove.append(vid)
-            
-            # Remove old verifications
-            for vid in to_remove:
-                del cls._verifications[vid]
+            while cls._verifications:
+                vid, verification = next(iter(cls._verifications.items()))
+                if verification['timestamp'] >= cutoff_time:
+                    break
+                cls._drop(vid)
+                cls._pending_ids.discard(vid)
+                to_remove.append(vid)
                 
             # Save changes to disk
             if to_remove:
-                cls._save_verifications()
+                cls._mark_dirty()
                 logger.info(f"Cleaned up {len(to_remove)} old verification records")
 
     @classmethod
     def reset_verifications_file(cls):
         """Emergency reset of the verifications file"""
-        try:
-            file_path = os.getenv("VERIFICATION_FILE_PATH", os.path.join(os.path.dirname(__file__), "verifications.json"))
-            # Create an empty JSON object
-            with open(file_path, 'w') as f:
-                f.write('{}')
-            logger.info("Reset verifications file to empty state")
-            return True
-        except Exception as e:
-            logger.error(f"Error resetting verifications file: {e}")
-            return False 
\ No newline at end of file
+        with cls._io_lock:
+            # Drop the in-memory records too: the snapshot write below refreshes _last_loaded_mtime, so
+            # no reload would clear them, and the next compaction would write them back to disk
+            with cls._lock:
+                cls._verifications.clear()
+                cls._serialized.clear()
+                cls._pending_ids.clear()
+                cls._pending_events = []
+                cls._dirty = False
+            # Swaps in an empty snapshot and truncates the journal, resetting its line count
+            if not cls._write_verifications({}):
+                return False
+        logger.info("Reset verifications file to empty state")
+        return True
+
+
+# Write any changes still pending in the flusher before the interpreter exits
+atexit.register(VerificationManager.flush)
@@ -15,6 +15,12 @@ import tempfile
 import uuid
 from health_check import health_bp
 
+try:
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:
+    orjson = None
+
 # Add the project root to Python path to enable imports
 project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
@@ -22,7 +28,7 @@ sys.path.append(str(project_root))
 from src.ai_generator import AIGenerator
 from src.config import Config
 # Import the TwitterService instead of direct scraper and tweet manager imports
-from src.twitter_bot.twitter_service import twitter_service
+from src.twitter_bot.twitter_service import get_twitter_service
 from src.verification_manager import VerificationManager
 
 # Configure logging
@@ -31,6 +37,24 @@ logger = logging.getLogger('web_interface')
 
 app = Flask(__name__)
 
+if orjson is not None:
+    class OrjsonProvider(DefaultJSONProvider):
+        """JSON provider that uses orjson for faster response encoding."""
+
+        def dumps(self, obj, **kwargs):
+            # Leave datetimes to ``default`` so they keep Flask's HTTP-date format
+            option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
+else:
+    logger.info("orjson not installed, using the default JSON provider")
+
 # Add Flask secret key from environment variable or use a default for development
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "3d6f45a5fc12445dbac2f59c3b6c7cb1d3c4a91764d5a788")
 
@@ -189,7 +213,8 @@ def post_to_twitter():
         
         logger.info(f"Using existing Twitter service for posting...")
         
-        # Use the existing Twitter service from twitter_service module
+        # Use the existing Twitter service singleton
+        twitter_service = get_twitter_service()
         # Skip initialization if it's already initialized
         if not twitter_service.is_initialized():
             logger.info("Twitter service not initialized yet, initializing...")
@@ -199,9 +224,10 @@ def post_to_twitter():
             if not initialization_success:
                 # Check for verification if initialization failed
                 if twitter_service.scraper and twitter_service.scraper.driver:
-                    if twitter_service.scraper.is_verification_screen():
+                    # Serialized with the bot's other browser operations
+                    if twitter_service.submit_scraper("is_verification_screen").result():
                         logger.warning("Twitter verification required")
-                        verification_success = twitter_service.scraper.handle_verification_screen()
+                        verification_success = twitter_service.submit_scraper("handle_verification_screen").result()
                         if not verification_success:
                             return jsonify({
                                 "success": False, 
@@ -0,0 +1,69 @@
+"""
+Tests for VerificationManager persistence: the snapshot/journal files and the in-memory state.
+"""
+
+import os
+import sys
+from collections import OrderedDict
+
+import pytest
+
+# Add project root to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src import verification_manager
+from src.verification_manager import VerificationManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """VerificationManager writing to a temporary directory with fresh class state"""
+    storage_path = tmp_path / "verifications.json"
+    monkeypatch.setattr(verification_manager, "_STORAGE_PATH", storage_path)
+    monkeypatch.setattr(verification_manager, "_JOURNAL_PATH", storage_path.with_suffix('.jsonl'))
+    monkeypatch.setattr(VerificationManager, "_verifications", OrderedDict())
+    monkeypatch.setattr(VerificationManager, "_serialized", {})
+    monkeypatch.setattr(VerificationManager, "_pending_ids", set())
+    monkeypatch.setattr(VerificationManager, "_pending_events", [])
+    monkeypatch.setattr(VerificationManager, "_journal_fh", None)
+    monkeypatch.setattr(VerificationManager, "_journal_lines", 0)
+    monkeypatch.setattr(VerificationManager, "_last_loaded_mtime", (0, 0))
+    yield VerificationManager
+    VerificationManager.flush()
+    if VerificationManager._journal_fh is not None:
+        VerificationManager._journal_fh.close()
+
+
+class TestVerificationManager:
+    """Persistence behaviour of VerificationManager"""
+
+    def test_pending_listed_in_registration_order(self, manager):
+        for vid in ("verify_c", "verify_a", "verify_b", "verify_done"):
+            manager.register_verification(vid, f"/static/screenshots/{vid}.jpg")
+        manager.complete_verification("verify_done")
+
+        assert list(manager.list_pending_verifications()) == ["verify_c", "verify_a", "verify_b"]
+
+    def test_reset_clears_memory_and_disk(self, manager):
+        manager.register_verification("verify_old", "/static/screenshots/old.jpg")
+        manager.flush()
+
+        assert manager.reset_verifications_file() is True
+
+        assert manager.list_pending_verifications() == {}
+        assert verification_manager._STORAGE_PATH.read_text() == "{}"
+        assert verification_manager._JOURNAL_PATH.read_bytes() == b""
+
+    def test_reset_is_not_undone_by_compaction(self, manager):
+        manager.register_verification("verify_old", "/static/screenshots/old.jpg")
+        manager.flush()
+        manager.reset_verifications_file()
+
+        manager.register_verification("verify_new", "/static/screenshots/new.jpg")
+        manager._save_verifications()
+
+        assert list(manager.list_pending_verifications()) == ["verify_new"]
+        assert "verify_old" not in verification_manager._STORAGE_PATH.read_text()